@@ -0,0 +1,200 @@
+"""
+benchmark.py - Throughput benchmarks of the Monopoly simulator, saved as JSON and compared to a baseline.
+
+Usage:
+    python benchmarks/benchmark.py --output baseline.json
+    python benchmarks/benchmark.py --output current.json --baseline baseline.json
+"""
+
+import os
+import sys
+import copy
+import json
+import logging
+import argparse
+import platform
+import datetime
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import monopoly
+from monopoly.Game import Game
+
+# Benchmark defaults
+PLAYERS = (2, 4, 8)
+NUM_GAMES = 100
+NUM_STATES = 200
+MIDGAME_ROUNDS = 30
+REPEAT = 3
+TOLERANCE = 0.10
+SEED = 2017
+
+def play_games(num_players=2, record=False, n_games=NUM_GAMES, seed=SEED):
+    """Time playing n_games seeded games, reusing one Game as Batch.play_games does."""
+    game = Game(0, num_players, recordData=record, seed=seed, debug=False)
+    turns = 0
+    start = timer()
+    for number in xrange(n_games):
+        game.reset(seed, number)
+        game.play_game()
+        turns += sum(plyr.turn for plyr in game.seats)
+    elapsed = timer() - start
+    return {
+        'games_per_s' : n_games / elapsed,
+        'turns_per_s' : turns / elapsed,
+        'us_per_turn' : 1e6 * elapsed / turns
+    }
+
+def midgame_states(num_players=4, n_states=NUM_STATES, seed=SEED):
+    """Play seeded games for MIDGAME_ROUNDS rounds. Return the games still being played."""
+    states = []
+    number = 0
+    while len(states) < n_states:
+        game = Game(number, num_players, seed=seed, debug=False)
+        game.play_game(MIDGAME_ROUNDS)
+        if len(game.players) > 1:
+            states.append(game)
+        number += 1
+    return states
+
+def take_turn(game):
+    """Every remaining player takes one turn."""
+    players = list(game.players)
+    for plyr in players:
+        if plyr in game.players:
+            plyr.take_turn()
+    return len(players)
+
+def rent(game):
+    """Determine the rent of every owned property."""
+    calls = 0
+    for loc, plyr in enumerate(game.owners):
+        if plyr is not None:
+            game.deeds[loc].rent(plyr)
+            calls += 1
+    return calls
+
+def liquidate(game):
+    """Every remaining player raises twice their money."""
+    players = list(game.players)
+    for plyr in players:
+        if plyr in game.players:
+            plyr.liquidate(2.0 * plyr.money)
+    return len(players)
+
+def develop(game):
+    """Every remaining player looks to develop."""
+    for plyr in game.players:
+        plyr.develop()
+    return len(game.players)
+
+def auction(game):
+    """Hold an auction for the first unowned property."""
+    if not game.properties:
+        return 0
+    game.auction(game.players, game.properties[0].loc)
+    return 1
+
+# Microbenchmarks and whether they change the game state
+MICROBENCHMARKS = [
+    ('Player.take_turn', take_turn, True),
+    ('Property.rent', rent, False),
+    ('Player.liquidate', liquidate, True),
+    ('Player.develop', develop, True),
+    ('Game.auction', auction, False)
+]
+
+def microbenchmark(func=None, states=None, mutates=False):
+    """Time func over the game states, on copies if it changes them."""
+    states = [copy.deepcopy(game) for game in states] if mutates else states
+    calls = 0
+    start = timer()
+    for game in states:
+        calls += func(game)
+    elapsed = timer() - start
+    return {
+        'calls' : calls,
+        'us_per_call' : 1e6 * elapsed / max(calls, 1)
+    }
+
+def best(func=None, repeat=REPEAT, key='', lower=False):
+    """Run a benchmark repeat times. Return the best result by key."""
+    results = [func() for _ in xrange(repeat)]
+    return sorted(results, key=lambda r: r[key], reverse=not lower)[0]
+
+def run_benchmarks(n_games=NUM_GAMES, n_states=NUM_STATES, repeat=REPEAT, seed=SEED):
+    """Run all benchmarks. Return a dict of benchmark name -> results."""
+    results = {}
+    for num_players in PLAYERS:
+        for record in (False, True):
+            name = 'Game.play_game[{}p{}]'.format(num_players, ', recordData' if record else '')
+            print('Running {}.'.format(name))
+            results[name] = best(lambda: play_games(num_players, record, n_games, seed), repeat, 'games_per_s')
+    states = midgame_states(4, n_states, seed)
+    for name, func, mutates in MICROBENCHMARKS:
+        print('Running {}.'.format(name))
+        results[name] = best(lambda: microbenchmark(func, states, mutates), repeat, 'us_per_call', lower=True)
+    return results
+
+def compare(results=None, baseline=None, tolerance=TOLERANCE):
+    """Compare results to baseline results. Return a list of (name, metric, baseline, current, change, regressed)."""
+    rows = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        metric = 'games_per_s' if 'games_per_s' in results[name] else 'us_per_call'
+        old, new = baseline[name][metric], results[name][metric]
+        # Positive change is always an improvement
+        change = (new - old) / old if metric == 'games_per_s' else (old - new) / old
+        rows.append((name, metric, old, new, change, change < -tolerance))
+    return rows
+
+def main():
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description='Benchmark Monopoly simulator throughput.')
+    parser.add_argument('--games', type=int, default=NUM_GAMES, help='games per play_game benchmark')
+    parser.add_argument('--states', type=int, default=NUM_STATES, help='mid game states per microbenchmark')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='repeats of each benchmark, the best is kept')
+    parser.add_argument('--seed', type=int, default=SEED, help='root seed of the benchmark games')
+    parser.add_argument('--output', default='', help='save results to this JSON file')
+    parser.add_argument('--baseline', default='', help='compare results to this JSON file')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='allowed slowdown before failing')
+    args = parser.parse_args()
+    # Keep game logging out of the timings
+    logging.basicConfig(level=logging.ERROR)
+
+    results = run_benchmarks(args.games, args.states, args.repeat, args.seed)
+    report = {
+        'meta' : {
+            'date' : datetime.datetime.now().isoformat(),
+            'version' : monopoly.__version__,
+            'python' : platform.python_version(),
+            'platform' : platform.platform(),
+            'games' : args.games,
+            'states' : args.states,
+            'repeat' : args.repeat,
+            'seed' : args.seed
+        },
+        'results' : results
+    }
+    for name in sorted(results):
+        print('{:36s} {}'.format(name, ', '.join('{} {:.1f}'.format(k, v) for k, v in sorted(results[name].items()))))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4, sort_keys=True)
+        print('Saved results to {}.'.format(args.output))
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        print('Compared to {}:'.format(args.baseline))
+        for name, metric, old, new, change, slower in compare(results, baseline, args.tolerance):
+            regressed = regressed or slower
+            flag = ' REGRESSION' if slower else ''
+            print('{:36s} {} {:.1f} -> {:.1f} ({:+.1f}%){}'.format(name, metric, old, new, 100.0 * change, flag))
+    return 1 if regressed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,13 +3,15 @@ Player.py - File for defining a Bank  class.
 """
 
 from monopoly.Constants import CARD_WIDTH, TOTAL_MONEY
+from monopoly.Ledger import BANK, OTHER
 
 class Bank(object):
     """Define a Bank for the Game."""
 
-    def __init__(self, money=0, game=None, name='', clipmoney=False):
+    def __init__(self, money=0, game=None, name='', clipmoney=False, account=BANK):
         """Initialize a Bank."""
         self.name = name if name else 'Bank'
+        self.account = account
         self.money = money
         self.game = game
         self.clipmoney = clipmoney
@@ -30,26 +32,31 @@ class Bank(object):
     def __repr__(self):
         return self.name
 
+    def reset(self, money=0):
+        """Reset the bank for a new game."""
+        self.money = money
+        self.turnover = 0
+        return self
+
     def check_turnover(self):
         """Check to see if money has run out."""
         if self.money < 0.0:
-            self.money += TOTAL_MONEY
+            self.game.ledger.mint(self, TOTAL_MONEY)
             self.turnover += 1
         return self
 
-    def add(self, amount=0.0, addfrom=None):
-        """Add an amount of money from someone."""
-        self.money += amount
+    def add(self, amount=0.0, addfrom=None, reason=OTHER):
+        """Add an amount of money from someone, who pays it."""
         if addfrom:
-            addfrom.pay(amount)
+            addfrom.pay(amount, self, reason)
+        else:
+            self.money += amount
         return self
 
-    def pay(self, amount=0.0, payto=None):
+    def pay(self, amount=0.0, payto=None, reason=OTHER):
         """Pay an amount of money to someone."""
         if self.money > 0 or not self.clipmoney:
-            self.money -= amount
-            if payto:
-                payto.add(amount)
+            self.game.ledger.transfer(self, payto, amount, reason)
             self.check_turnover()
         return self
 
@@ -0,0 +1,385 @@
+"""
+Batch.py - Functions for playing many Games across processes.
+"""
+
+import os
+import pickle
+import logging
+import itertools
+import multiprocessing
+from timeit import default_timer as timer
+import numpy as np
+import pandas as pd
+
+from monopoly.Constants import INIT_CASH, JAIL_COST
+from monopoly.Game import Game
+from monopoly.Strategy import Strategy
+from monopoly.Record import MANIFEST, open_sink, write_frame, write_manifest
+from monopoly.Stream import new_seed
+
+# Upper bound of games sent to a worker at once
+MAX_CHUNKSIZE = 1000
+# Seconds between checkpoints of a batch run
+CHECKPOINT_INTERVAL = 60.0
+# Two sided normal quantiles of the supported confidence levels
+Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.9600, 0.99: 2.5758, 0.999: 3.2905}
+
+def play_games(start=0, stop=0, num_players=2, max_rounds=100, seed=None, timing=False, record_dir=None, record_format='binary',
+               strategies=None, init_cash=INIT_CASH, jail_cost=JAIL_COST):
+    """
+    Play games numbered start to stop in this process. Return a list of game summaries.
+
+    With a record_dir, the per turn records are streamed to this process's part of the directory.
+    """
+    sink = open_sink(record_dir, record_format, os.getpid()) if record_dir else None
+    summaries = []
+    game = None
+    for number in xrange(start, stop):
+        # Build the players, properties and cards once per chunk and reset them between games
+        if game:
+            game.reset(seed, number)
+        else:
+            game = Game(
+                number, num_players, seed=seed, timing=timing, recordData=bool(sink), sink=sink, strategies=strategies,
+                init_cash=init_cash, jail_cost=jail_cost
+            )
+        game.play_game(max_rounds)
+        summaries.append(game.summary())
+    if sink and game:
+        game.buffer.flush()
+    return summaries
+
+def _play_chunk(args):
+    """Unpack a pool task for play_games."""
+    return play_games(*args)
+
+def chunk_games(n_games=0, chunksize=1, start=0):
+    """Split game numbers into (start, stop) ranges of at most chunksize games."""
+    stop = start + n_games
+    return [(i, min(i + chunksize, stop)) for i in xrange(start, stop, chunksize)]
+
+def canonical(value=None):
+    """Convert a configuration value to nested lists of plain values, in a stable order for comparing and hashing."""
+    if isinstance(value, dict):
+        return sorted([[canonical(k), canonical(v)] for k, v in value.items()], key=repr)
+    elif isinstance(value, (set, frozenset)):
+        return sorted([canonical(v) for v in value], key=repr)
+    elif isinstance(value, (list, tuple)):
+        return [canonical(v) for v in value]
+    elif isinstance(value, np.ndarray):
+        return value.tolist()
+    elif isinstance(value, np.generic):
+        return value.item()
+    elif hasattr(value, '__dict__') and not callable(value):
+        return [type(value).__module__, type(value).__name__, canonical(vars(value))]
+    return value
+
+def start_checkpoint(path='', run=None, seed=None):
+    """Create the checkpoint of a batch run, holding its settings and seed, through a temporary file."""
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump({'run' : run, 'seed' : seed}, f, pickle.HIGHEST_PROTOCOL)
+    os.rename(path + '.tmp', path)
+    return path
+
+def append_checkpoint(path='', chunks=None):
+    """Append finished chunks of game summaries to a checkpoint, so each save only writes the new games."""
+    with open(path, 'ab') as f:
+        for chunk in chunks:
+            pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    return path
+
+def load_checkpoint(path='', run=None, seed=None):
+    """
+    Load the checkpoint of a batch run with the settings run. Return (seed, summaries), or None if there is none.
+    A chunk cut short by preemption is dropped from the file.
+    """
+    if not os.path.exists(path):
+        return None
+    summaries = []
+    with open(path, 'r+b') as f:
+        header = pickle.load(f)
+        if header['run'] != run or (seed is not None and header['seed'] != seed):
+            raise ValueError('Checkpoint {} is of a different run ({}, seed {}).'.format(path, header['run'], header['seed']))
+        end = f.tell()
+        while True:
+            try:
+                chunk = pickle.load(f)
+            # A partly written chunk can fail to unpickle in many ways
+            except Exception: # pylint:disable=broad-except
+                break
+            summaries.extend(chunk)
+            end = f.tell()
+        f.truncate(end)
+    logging.info('Resuming from %s after %s games.', path, len(summaries))
+    return header['seed'], summaries
+
+def run_games(n_games=1, num_players=2, workers=None, max_rounds=100, chunksize=None, seed=None, timing=False, record_dir=None,
+              record_format='binary', strategies=None, start=0, checkpoint=None, checkpoint_interval=CHECKPOINT_INTERVAL,
+              init_cash=INIT_CASH, jail_cost=JAIL_COST):
+    """
+    Play many games, numbered from start, over a process pool. Return a DataFrame of game summaries indexed by game
+    number.
+
+    Every game's random stream is derived from (seed, game number), so game N can be replayed alone with
+    Game(N, num_players, seed=seed) regardless of workers or chunking. With timing, the summaries include
+    the time_<phase> and calls_<phase> counters of every game.
+
+    With a record_dir, every game's per turn record is streamed to disk as it is played, one part per worker
+    in record_format ('binary' or 'csv'), with the game summaries and a manifest to combine them by
+    Record.read_records. Binary records can be queried in place with Results.ResultsStore.
+
+    strategies is one Strategy for every seat or a list with one per seat, they are pickled to the workers.
+    init_cash and jail_cost override the rules' starting money and fee to get out of jail, as in Game.
+
+    With a checkpoint path, the settings and seed are saved there, then the newly finished games' summaries are
+    appended every checkpoint_interval seconds, at the end and when the run fails. Running again with the same
+    checkpoint and settings, strategies included, resumes after the saved games, with the same summaries as an
+    uninterrupted run. Checkpoints are not supported with a record_dir.
+    """
+    workers = workers if workers else multiprocessing.cpu_count()
+    chunksize = chunksize if chunksize else max(1, min(MAX_CHUNKSIZE, n_games // (4 * workers)))
+    if record_dir and checkpoint:
+        raise ValueError('Checkpoints cannot resume streamed records.')
+    run = {
+        'n_games' : n_games, 'num_players' : num_players, 'max_rounds' : max_rounds, 'start' : start, 'timing' : timing,
+        'strategies' : canonical(strategies), 'init_cash' : init_cash, 'jail_cost' : jail_cost
+    }
+    state = load_checkpoint(checkpoint, run, seed) if checkpoint else None
+    seed = state[0] if state else seed if seed is not None else new_seed()
+    played = state[1] if state else []
+    cursor = start + len(played)
+    if checkpoint and not state:
+        start_checkpoint(checkpoint, run, seed)
+    if record_dir:
+        if os.path.exists(os.path.join(record_dir, MANIFEST)):
+            raise ValueError('Record directory {} already holds a run.'.format(record_dir))
+        if not os.path.isdir(record_dir):
+            os.makedirs(record_dir)
+    tasks = [
+        chunk + (num_players, max_rounds, seed, timing, record_dir, record_format, strategies, init_cash, jail_cost)
+        for chunk in chunk_games(start + n_games - cursor, chunksize, cursor)
+    ]
+    logging.info('Running %s games of %s players on %s workers (%s chunks).', start + n_games - cursor, num_players, workers, len(tasks))
+
+    # Play in process if there is nothing to spread out, chunks come back in order so finished games are contiguous
+    pool = None
+    if workers == 1 or len(tasks) <= 1:
+        chunks = (_play_chunk(task) for task in tasks)
+    else:
+        pool = multiprocessing.Pool(workers)
+        chunks = pool.imap(_play_chunk, tasks, chunksize=1)
+    unsaved = []
+    try:
+        saved = timer()
+        for chunk in chunks:
+            played.extend(chunk)
+            unsaved.append(chunk)
+            if checkpoint and timer() - saved >= checkpoint_interval:
+                # Taken off unsaved first, so a failed save is never appended twice
+                saving, unsaved = unsaved, []
+                append_checkpoint(checkpoint, saving)
+                saved = timer()
+    except BaseException:
+        # Stop the queued chunks rather than play them for nothing, keeping the finished ones
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if checkpoint and unsaved:
+            append_checkpoint(checkpoint, unsaved)
+        raise
+    if pool is not None:
+        pool.close()
+        pool.join()
+    if checkpoint and unsaved:
+        append_checkpoint(checkpoint, unsaved)
+
+    summaries = pd.DataFrame(played)
+    if not summaries.empty:
+        summaries = summaries.set_index('game').sort_index()
+    if record_dir:
+        # The game summaries are stored next to the records as a binary part
+        write_frame(os.path.join(record_dir, 'games'), summaries.reset_index())
+        write_manifest(record_dir, record_format, games='games', n_games=n_games, num_players=num_players, max_rounds=max_rounds, seed=seed)
+    return summaries
+
+def evaluate_strategies(strategies=None, n_games=1, workers=None, max_rounds=100, seed=None):
+    """
+    Play n_games for every rotation of strategies around the table, one strategy per seat. Return a DataFrame of
+    name, games, wins, win rate and mean final networth per strategy, indexed by its position in strategies, so
+    strategies sharing a name are still told apart.
+
+    Every rotation plays the same seeded games, so the strategies are compared on the same dice and cards.
+    """
+    seed = seed if seed is not None else new_seed()
+    num_players = len(strategies)
+    wins = [0] * num_players
+    networth = [0.0] * num_players
+    for shift in xrange(num_players):
+        seating = strategies[shift:] + strategies[:shift]
+        summaries = run_games(n_games, num_players, workers, max_rounds, seed=seed, strategies=seating)
+        for seat in xrange(num_players):
+            # Position in strategies of the strategy at this seat
+            index = (shift + seat) % num_players
+            wins[index] += (summaries['winner'] == seat).sum()
+            networth[index] += summaries['networth_{}'.format(seat)].sum()
+    games = n_games * num_players
+    evaluation = pd.DataFrame({
+        'name' : [strategy.name for strategy in strategies],
+        'games' : [games] * num_players,
+        'wins' : wins,
+        'win_rate' : [w / float(games) for w in wins],
+        'networth' : [n / games for n in networth]
+    }, columns=['name', 'games', 'wins', 'win_rate', 'networth'])
+    evaluation.index.name = 'strategy'
+    return evaluation
+
+# Sweepable parameters and their defaults
+SWEEP_PARAMS = [
+    ('num_players', 2),
+    ('max_rounds', 100),
+    ('init_cash', INIT_CASH),
+    ('jail_cost', JAIL_COST),
+    ('risk_mean', 0.75),
+    ('risk_std', 0.1)
+]
+
+def grid_cells(grid=None):
+    """Expand a grid of parameter -> list of values to a list of parameter dicts, one per cell."""
+    defaults = dict(SWEEP_PARAMS)
+    unknown = set(grid) - set(defaults)
+    if unknown:
+        raise ValueError('Cannot sweep {}, parameters are {}.'.format(sorted(unknown), [name for name, _ in SWEEP_PARAMS]))
+    names = [name for name, _ in SWEEP_PARAMS]
+    values = [grid[name] if name in grid else [defaults[name]] for name in names]
+    return [dict(zip(names, cell)) for cell in itertools.product(*values)]
+
+def _play_cell(args):
+    """Play a chunk of a sweep cell's games. Return (cell index, summaries)."""
+    index, start, stop, cell, seed = args
+    strategy = Strategy(risk_mean=cell['risk_mean'], risk_std=cell['risk_std'])
+    summaries = play_games(
+        start, stop, cell['num_players'], cell['max_rounds'], seed, strategies=strategy, init_cash=cell['init_cash'],
+        jail_cost=cell['jail_cost']
+    )
+    return index, summaries
+
+def summarize_cell(cell=None, summaries=None):
+    """Summarize a sweep cell's games as one row: parameters, game lengths, finished games and win rates per seat."""
+    # Chunks finish in any order
+    games = pd.DataFrame(summaries).sort_values('game')
+    bankrupt = games[['bankrupt_{}'.format(seat) for seat in xrange(cell['num_players'])]] > 0
+    row = dict(cell)
+    row['games'] = len(games)
+    row['rounds_mean'] = games['rounds'].mean()
+    row['rounds_std'] = games['rounds'].std()
+    # Games that ended with one player left rather than at max_rounds
+    row['finished'] = (bankrupt.sum(axis=1) == cell['num_players'] - 1).mean()
+    row['winner_networth'] = games.apply(lambda game: game['networth_{}'.format(int(game['winner']))], axis=1).mean()
+    for seat in xrange(cell['num_players']):
+        row['win_rate_{}'.format(seat)] = (games['winner'] == seat).mean()
+    return row
+
+def sweep(grid=None, games_per_cell=100, workers=None, chunksize=None, seed=None):
+    """
+    Play games_per_cell games for every combination of the grid's parameter values. Return a DataFrame with one row
+    per cell, its parameters and a summary of its games.
+
+    grid maps any of num_players, max_rounds, init_cash, jail_cost, risk_mean and risk_std (the risk tolerance
+    distribution of the players, risk_mean at most 1) to a list of values, the rest keep their defaults. All cells'
+    chunks of games are handed out to one pool as workers free up, so cells with long games do not leave cores idle.
+    Every cell plays games 0 to games_per_cell with the same root seed, so cells are compared on the same random
+    streams, and a cell's games are those of run_games(games_per_cell, num_players, max_rounds=max_rounds, seed=seed,
+    strategies=Strategy(risk_mean=risk_mean, risk_std=risk_std), init_cash=init_cash, jail_cost=jail_cost).
+    """
+    if games_per_cell < 1:
+        raise ValueError('Every cell needs at least one game, got games_per_cell={}.'.format(games_per_cell))
+    workers = workers if workers else multiprocessing.cpu_count()
+    seed = seed if seed is not None else new_seed()
+    cells = grid_cells(grid if grid else {})
+    high = sorted(set(cell['risk_mean'] for cell in cells if cell['risk_mean'] > 1.0))
+    if high:
+        raise ValueError('Players never build past their cash, risk_mean above 1 plays as 1, got {}.'.format(high))
+    chunksize = chunksize if chunksize else max(1, min(MAX_CHUNKSIZE, len(cells) * games_per_cell // (4 * workers)))
+    tasks = [(index, start, stop, cell, seed) for index, cell in enumerate(cells) for start, stop in chunk_games(games_per_cell, chunksize)]
+    logging.info('Sweeping %s cells of %s games on %s workers (%s chunks).', len(cells), games_per_cell, workers, len(tasks))
+
+    results = [[] for _ in cells]
+    if workers == 1 or len(tasks) == 1:
+        for task in tasks:
+            index, summaries = _play_cell(task)
+            results[index].extend(summaries)
+    else:
+        pool = multiprocessing.Pool(workers)
+        try:
+            for index, summaries in pool.imap_unordered(_play_cell, tasks):
+                results[index].extend(summaries)
+        finally:
+            pool.close()
+            pool.join()
+
+    rows = [summarize_cell(cell, summaries) for cell, summaries in zip(cells, results)]
+    columns = [name for name, _ in SWEEP_PARAMS] + ['games', 'rounds_mean', 'rounds_std', 'finished', 'winner_networth']
+    seats = max(cell['num_players'] for cell in cells)
+    columns += ['win_rate_{}'.format(seat) for seat in xrange(seats)]
+    summary = pd.DataFrame(rows, columns=columns)
+    summary.index.name = 'cell'
+    return summary
+
+def estimates(summaries=None, num_players=2, confidence=0.95):
+    """
+    Estimate the win rate and mean final networth of every seat and the mean game length from game summaries.
+    Return a DataFrame of mean and confidence interval half width per estimate.
+    """
+    z = Z_SCORES[confidence]
+    n = float(len(summaries))
+    rows = []
+    for seat in xrange(num_players):
+        p = (summaries['winner'] == seat).mean()
+        # Keep a non zero width until a seat has both won and lost
+        q = min(max(p, 0.5 / n), 1.0 - 0.5 / n)
+        rows.append(('win_rate_{}'.format(seat), p, z * np.sqrt(q * (1.0 - q) / n)))
+    for col in ['rounds'] + ['networth_{}'.format(seat) for seat in xrange(num_players)]:
+        values = summaries[col]
+        std = values.std() if n > 1 else np.inf
+        rows.append((col, values.mean(), z * std / np.sqrt(n)))
+    return pd.DataFrame(rows, columns=['estimate', 'mean', 'half_width']).set_index('estimate')
+
+def run_until_converged(num_players=2, win_rate_tol=0.01, rounds_tol=1.0, networth_tol=50.0, confidence=0.95, batch=200,
+                        max_games=100000, workers=None, max_rounds=100, seed=None, strategies=None):
+    """
+    Play games in batches until every estimate's confidence interval half width is within its tolerance, win rates by
+    seat within win_rate_tol, mean rounds within rounds_tol and mean final networth by seat within networth_tol, or
+    max_games have been played. Return (summaries, estimates), as run_games and estimates.
+
+    After the first batch, every batch is sized to the games the widest interval still needs, as widths shrink with
+    the square root of the games. Games are numbered consecutively, so the summaries are those of run_games with the
+    same seed and total number of games.
+    """
+    if confidence not in Z_SCORES:
+        raise ValueError('Confidence must be one of {}.'.format(sorted(Z_SCORES)))
+    if batch < 1 or max_games < 1:
+        raise ValueError('Batches need at least one game, got batch={} and max_games={}.'.format(batch, max_games))
+    seed = seed if seed is not None else new_seed()
+    tolerances = pd.Series(
+        [win_rate_tol] * num_players + [rounds_tol] + [networth_tol] * num_players,
+        index=['win_rate_{}'.format(seat) for seat in xrange(num_players)] + ['rounds'] + ['networth_{}'.format(seat) for seat in xrange(num_players)]
+    )
+    frames = []
+    played, n_games = 0, min(batch, max_games)
+    while n_games > 0:
+        frames.append(run_games(n_games, num_players, workers, max_rounds, seed=seed, strategies=strategies, start=played))
+        played += n_games
+        summaries = pd.concat(frames)
+        results = estimates(summaries, num_players, confidence)
+        results['tolerance'] = tolerances
+        results['converged'] = results['half_width'] <= results['tolerance']
+        logging.info('Played %s games, %s of %s estimates converged.', played, results['converged'].sum(), len(results))
+        if results['converged'].all():
+            break
+        # Games needed by the widest interval, relative to the games played
+        ratio = (results['half_width'] / results['tolerance']).max()
+        needed = int(np.ceil(played * ratio ** 2)) if np.isfinite(ratio) else 2 * played
+        n_games = min(max(needed - played, batch), max_games - played)
+    return summaries, results
@@ -0,0 +1,40 @@
+"""
+Board.py - Static per space tables, built once from the property definitions.
+"""
+
+import numpy as np
+
+from monopoly.Constants import MAX_LEVEL, NUM_PROPERTIES, SPACE, PROPERTY_DEFS, COLORS, COLOR_INDEX, COLOR_COUNTS, MONOPOLY_COLORS
+
+# Space category codes and their names
+OTHER, CARD, RAILROAD, UTILITY, PROPERTY = range(5)
+CATEGORY_NAMES = ['other', 'card', 'railroad', 'utility', 'property']
+
+# Per space tables
+CATEGORY = np.full(NUM_PROPERTIES, OTHER, dtype=np.int64)
+GROUP = np.full(NUM_PROPERTIES, -1, dtype=np.int64)
+PRICE = np.zeros(NUM_PROPERTIES)
+MORTGAGE = np.zeros(NUM_PROPERTIES)
+BUILD_COST = np.zeros(NUM_PROPERTIES)
+RENTS = np.zeros((NUM_PROPERTIES, MAX_LEVEL + 1))
+for loc, (name, color) in SPACE.items():
+    if name in {'Community Chest', 'Chance'}:
+        CATEGORY[loc] = CARD
+    elif color == 'Railroad':
+        CATEGORY[loc] = RAILROAD
+    elif color == 'Utility':
+        CATEGORY[loc] = UTILITY
+    elif color:
+        CATEGORY[loc] = PROPERTY
+for name, color, loc, price, rents, mortgage, cost in PROPERTY_DEFS:
+    GROUP[loc] = COLOR_INDEX[color]
+    PRICE[loc] = price
+    MORTGAGE[loc] = mortgage
+    BUILD_COST[loc] = cost if cost else 0.0
+    RENTS[loc, :len(rents)] = rents
+
+# Per color group tables
+GROUP_SIZE = np.array([COLOR_COUNTS[color] for color in COLORS])
+GROUP_MASK = np.array([GROUP == i for i in xrange(len(COLORS))])
+GROUP_LOCS = [np.flatnonzero(mask) for mask in GROUP_MASK]
+MONOPOLY_GROUPS = [COLOR_INDEX[color] for color in MONOPOLY_COLORS]
@@ -0,0 +1,156 @@
+"""
+Cache.py - File for defining a ResultsCache class.
+"""
+
+import os
+import pickle
+import hashlib
+import logging
+import pandas as pd
+
+import monopoly
+from monopoly import Constants
+from monopoly.Constants import INIT_CASH, JAIL_COST
+from monopoly.Batch import run_games, canonical
+
+# Default size cap of a cache directory, in bytes
+MAX_BYTES = 1 << 30
+# Range file names, first and one past the last game number
+RANGE_FILE = '{:012d}-{:012d}.pkl'
+
+def constants():
+    """Return the rule constants, every upper case name of Constants."""
+    return {name: value for name, value in vars(Constants).items() if name.isupper()}
+
+def config_key(config=None):
+    """Hash a configuration to a hex key."""
+    return hashlib.sha1(repr(canonical(config)).encode('utf-8')).hexdigest()
+
+class ResultsCache(object):
+    """
+    Defines an on disk cache of run_games summaries. Games are stored as pickled ranges of game numbers under a
+    directory named by the hash of the configuration they were played with: the rule constants, package version,
+    players, strategies, max_rounds, seed, init_cash and jail_cost. A request plays only the game numbers missing from the cache.
+    Ranges are evicted least recently used first, by modification time, once the cache is over max_bytes.
+    """
+
+    def __init__(self, cache_dir='', max_bytes=MAX_BYTES):
+        """Initialize a cache."""
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+    def __repr__(self):
+        return 'ResultsCache ({}, {} bytes)'.format(self.cache_dir, self.size())
+
+    @staticmethod
+    def config(num_players=2, max_rounds=100, seed=None, strategies=None, init_cash=INIT_CASH, jail_cost=JAIL_COST):
+        """Return the full configuration games are played with."""
+        return {
+            'version' : monopoly.__version__,
+            'constants' : constants(),
+            'num_players' : num_players,
+            'max_rounds' : max_rounds,
+            'seed' : seed,
+            'strategies' : strategies,
+            'init_cash' : init_cash,
+            'jail_cost' : jail_cost
+        }
+
+    def files(self):
+        """Return every range file of the cache as (path, size, last used time)."""
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith('.pkl'):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def size(self):
+        """Return the total size of the range files, in bytes."""
+        return sum(size for _, size, _ in self.files())
+
+    def ranges(self, key=''):
+        """Return the cached (start, stop, path) game ranges of a configuration key."""
+        path = os.path.join(self.cache_dir, key)
+        if not os.path.isdir(path):
+            return []
+        ranges = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.pkl'):
+                start, stop = name[:-len('.pkl')].split('-')
+                ranges.append((int(start), int(stop), os.path.join(path, name)))
+        return ranges
+
+    @staticmethod
+    def load(path=''):
+        """Load a range of summaries, marking it as used."""
+        with open(path, 'rb') as f:
+            summaries = pickle.load(f)
+        os.utime(path, None)
+        return summaries
+
+    def save(self, key='', summaries=None, start=0, stop=0):
+        """Save a range of summaries. Return its path."""
+        path = os.path.join(self.cache_dir, key)
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        path = os.path.join(path, RANGE_FILE.format(start, stop))
+        # Write then rename, so a killed run never leaves a partial range
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(summaries, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(path + '.tmp', path)
+        return path
+
+    def evict(self, keep=None):
+        """Delete least recently used ranges, except those in keep, until the cache fits in max_bytes."""
+        keep = set(keep) if keep else set()
+        files = sorted(self.files(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if total <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            os.remove(path)
+            total -= size
+            logging.info('Evicted %s from the results cache.', path)
+            if not os.listdir(os.path.dirname(path)):
+                os.rmdir(os.path.dirname(path))
+        return self
+
+    def run_games(self, n_games=1, num_players=2, workers=None, max_rounds=100, seed=None, strategies=None, start=0, init_cash=INIT_CASH, jail_cost=JAIL_COST):
+        """
+        Return the summaries of games start to start + n_games, as run_games does. Cached games are loaded and
+        only the missing game numbers are played, then cached.
+        """
+        if seed is None:
+            raise ValueError('Cached games need a seed.')
+        # Nothing to load or play, as run_games
+        if n_games < 1:
+            return pd.DataFrame()
+        stop = start + n_games
+        key = config_key(self.config(num_players, max_rounds, seed, strategies, init_cash, jail_cost))
+        frames, used = [], []
+        missing = [(start, stop)]
+        for first, last, path in self.ranges(key):
+            if first >= stop or last <= start:
+                continue
+            frames.append(self.load(path))
+            used.append(path)
+            # Remove the cached range from the missing ones
+            missing = [(a, b) for lo, hi in missing for a, b in ((lo, min(hi, first)), (max(lo, last), hi)) if a < b]
+        logging.info('Results cache has %s of %s games.', n_games - sum(b - a for a, b in missing), n_games)
+        for first, last in missing:
+            summaries = run_games(
+                last - first, num_players, workers, max_rounds, seed=seed, strategies=strategies, start=first,
+                init_cash=init_cash, jail_cost=jail_cost
+            )
+            frames.append(summaries)
+            used.append(self.save(key, summaries, first, last))
+        self.evict(used)
+        summaries = pd.concat(frames).sort_index()
+        return summaries.loc[start:stop - 1]
@@ -6,13 +6,15 @@ Player.py - File for defining a Card class.
 from monopoly.Constants import CARD_WIDTH
 
 class Card(object):
-    """Defines a game card."""
+    """Defines a game card, its rule is an op code and arguments followed by Player.follow."""
 
-    def __init__(self, deck='', name='', rule=None):
+    def __init__(self, deck='', name='', op=0, a=0, b=0):
         """Initialize a card"""
         self.deck = deck
         self.name = name
-        self.rule = rule
+        self.op = op
+        self.a = a
+        self.b = b
 
     def __str__(self):
         """String print out of card."""
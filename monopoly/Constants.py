@@ -76,6 +76,54 @@ COMMUNITY_CHEST = (2, 17, 33)
 UTILITIES = (12, 28)
 RAILROADS = (5, 15, 25, 35)
 
+# Card effect op codes, a card's a and b arguments depend on its op:
+#   ADVANCE to space a, NEAREST space of NEAREST_SPACES[a], MOVE a spaces, COLLECT or PAY a, PAY_EACH or
+#   COLLECT_EACH player a, REPAIRS of a per house and b per hotel, GO_JAIL and keep JAIL_FREE
+ADVANCE, NEAREST, MOVE, COLLECT, PAY, PAY_EACH, COLLECT_EACH, REPAIRS, GO_JAIL, JAIL_FREE = range(10)
+NEAREST_SPACES = [UTILITIES, RAILROADS]
+
+# Game Chance and Community Chest Cards, in deck order before shuffling
+# pylint:disable=bad-whitespace
+CARD_INDX = ['deck',                                    'name',         'op',          'a',   'b']
+CHANCE_CARD_DEFS = [
+    ('Chance',                                 'Advance to Go',      ADVANCE,           GO,     0),
+    ('Chance',                           'Advance to Illinois',      ADVANCE,     ILLINOIS,     0),
+    ('Chance',                  'Advance to St. Charles Place',      ADVANCE,   ST_CHARLES,     0),
+    ('Chance',                    'Advance to Nearest Utility',      NEAREST,            0,     0),
+    ('Chance',                   'Advance to Nearest Railroad',      NEAREST,            1,     0),
+    ('Chance',                        'Bank pays you dividend',      COLLECT,         50.0,     0),
+    ('Chance',                          'Get out of Jail Free',    JAIL_FREE,            0,     0),
+    ('Chance',                              'Go Back 3 Spaces',         MOVE,           -3,     0),
+    ('Chance',                                    'Go To Jail',      GO_JAIL,            0,     0),
+    ('Chance',                          'Make General Repairs',      REPAIRS,         25.0, 100.0),
+    ('Chance',                                  'Pay Poor Tax',          PAY,         15.0,     0),
+    ('Chance',                   'Advance to Reading Railroad',      ADVANCE,      READING,     0),
+    ('Chance',                          'Advance to Boardwalk',      ADVANCE,    BOARDWALK,     0),
+    ('Chance',   'You have been elected Chairman of the Board',     PAY_EACH,         50.0,     0),
+    ('Chance',                    'Your building loan matures',      COLLECT,        150.0,     0),
+    ('Chance',          'You have won a crossword competition',      COLLECT,        100.0,     0)
+]
+COMMUNITY_CHEST_CARD_DEFS = [
+    ( 'Chest',                                 'Advance to Go',      ADVANCE,           GO,     0),
+    ( 'Chest',                      'Bank Error in Your Favor',      COLLECT,        200.0,     0),
+    ( 'Chest',                                'Doctor\'s fees',          PAY,         50.0,     0),
+    ( 'Chest',                    'From Sale of Stock You Get',      COLLECT,         50.0,     0),
+    ( 'Chest',                          'Get out of Jail Free',    JAIL_FREE,            0,     0),
+    ( 'Chest',                                    'Go To Jail',      GO_JAIL,            0,     0),
+    ( 'Chest',                             'Grand Opera Night', COLLECT_EACH,         50.0,     0),
+    ( 'Chest',                          'Holiday Fund Matures',      COLLECT,        100.0,     0),
+    ( 'Chest',                             'Income Tax Refund',      COLLECT,         20.0,     0),
+    ( 'Chest',                           'It is Your Birthday', COLLECT_EACH,         10.0,     0),
+    ( 'Chest',                        'Life Insurance Matures',      COLLECT,        100.0,     0),
+    ( 'Chest',                              'Pay Hospital Fee',          PAY,        100.0,     0),
+    ( 'Chest',                               'Pay School Fees',          PAY,        150.0,     0),
+    ( 'Chest',                       'Receive Consultancy Fee',      COLLECT,         25.0,     0),
+    ( 'Chest',           'You are Assessed for Street Repairs',      REPAIRS,         40.0, 115.0),
+    ( 'Chest', 'You Have Won Second Prize in a Beauty Contest',      COLLECT,         10.0,     0),
+    ( 'Chest',                                   'You Inherit',      COLLECT,        100.0,     0)
+]
+# pylint:enable=bad-whitespace
+
 # Game Momey Constants
 MONEY = {
     1   : 40,
@@ -142,3 +190,10 @@ for _, color, loc, _, _, _, _ in PROPERTY_DEFS:
         COLOR_PROPERTIES[color] = [loc]
     elif color:
         COLOR_PROPERTIES[color].append(loc)
+COLORS = []
+for _, color, _, _, _, _, _ in PROPERTY_DEFS:
+    if color not in COLORS:
+        COLORS.append(color)
+COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+MONOPOLY_COLORS = [color for color in COLORS if color not in ('Railroad', 'Utility')]
+MONOPOLY_MASK = sum([1 << COLOR_INDEX[color] for color in MONOPOLY_COLORS])
@@ -0,0 +1,400 @@
+"""
+Engine.py - File for defining a vectorized Engine class that plays many games in lockstep.
+"""
+
+import logging
+import datetime
+import numpy as np
+import pandas as pd
+
+from monopoly.Constants import MAX_LEVEL, MAX_HOUSE_LEVEL, MAX_DOUBLES, JAIL_COST, NUM_PROPERTIES, INIT_CASH
+from monopoly.Constants import GO, JAIL, GO_TO_JAIL, LUXURY_TAX, INCOME_TAX, FREE_PARKING, COMMUNITY_CHEST, CHANCE
+from monopoly.Constants import ADVANCE, NEAREST, MOVE, COLLECT, PAY, PAY_EACH, COLLECT_EACH, REPAIRS, GO_JAIL, JAIL_FREE
+from monopoly.Constants import NEAREST_SPACES, CHANCE_CARD_DEFS, COMMUNITY_CHEST_CARD_DEFS
+from monopoly.Board import CATEGORY, GROUP, PRICE, MORTGAGE, BUILD_COST, RENTS, GROUP_SIZE, GROUP_MASK, GROUP_LOCS, MONOPOLY_GROUPS
+from monopoly.Board import CARD, RAILROAD, UTILITY
+from monopoly.Ledger import BANK, FREEPARKING
+from monopoly.Stream import new_seed, spawn_seed
+
+# Card effects, each card is (op, a, b), in deck order
+CHANCE_EFFECTS = [(op, a, b) for _, _, op, a, b in CHANCE_CARD_DEFS]
+COMMUNITY_CHEST_EFFECTS = [(op, a, b) for _, _, op, a, b in COMMUNITY_CHEST_CARD_DEFS]
+
+# Chance and Community Chest space masks
+DECK_SPACES = [np.array([loc in spaces for loc in xrange(NUM_PROPERTIES)]) for spaces in (CHANCE, COMMUNITY_CHEST)]
+
+# Destination of the "Advance to Nearest" cards from every space
+NEAREST_TABLE = np.array([
+    [next((s for s in spaces if s > loc), spaces[0]) for loc in xrange(NUM_PROPERTIES)]
+    for spaces in NEAREST_SPACES
+])
+
+class Engine(object):
+    """Defines a lockstep engine that plays many games of Monopoly at once with NumPy arrays."""
+
+    def __init__(self, num_games, num_players, seed=None, start=0):
+        """
+        Initialize the state of num_games games, numbered from start.
+
+        Lockstep games share one random stream derived from (seed, start), so a batch is reproduced by
+        its seed, start and size rather than game by game.
+        """
+        self.num_games = num_games
+        self.num_players = num_players
+        self.start = start
+        self.seed = seed if seed is not None else new_seed()
+        self.random = np.random.RandomState(spawn_seed(self.seed, start))
+        self.start_time = 0
+        self.end_time = 0
+        self.elapsed_time = 0
+        # Player state
+        self.position = np.zeros((num_games, num_players), dtype=np.int64)
+        self.money = np.full((num_games, num_players), INIT_CASH)
+        self.debt = np.zeros((num_games, num_players))
+        self.active = np.ones((num_games, num_players), dtype=bool)
+        self.in_jail = np.zeros((num_games, num_players), dtype=bool)
+        self.jail_tries = np.zeros((num_games, num_players), dtype=np.int64)
+        self.risk_tolerance = self.random.normal(0.75, 0.1, size=(num_games, num_players))
+        # Board state, -1 is unowned
+        self.owner = np.full((num_games, NUM_PROPERTIES), -1, dtype=np.int64)
+        self.mortgaged = np.zeros((num_games, NUM_PROPERTIES), dtype=bool)
+        self.level = np.zeros((num_games, NUM_PROPERTIES), dtype=np.int64)
+        # Game state
+        self.freeparking = np.zeros(num_games)
+        self.rounds = np.zeros(num_games, dtype=np.int64)
+        # Round each player went bankrupt in, 0 while playing
+        self.bankrupt_round = np.zeros((num_games, num_players), dtype=np.int64)
+        self.done = np.zeros(num_games, dtype=bool)
+        # Card decks, each a shuffled order of card indices, the next card and the "Get out of Jail Free" holder
+        self.decks = []
+        for effects in (CHANCE_EFFECTS, COMMUNITY_CHEST_EFFECTS):
+            ops = np.array([op for op, _, _ in effects])
+            deck = {
+                'op' : ops,
+                'a' : np.array([a for _, a, _ in effects], dtype=float),
+                'b' : np.array([b for _, _, b in effects], dtype=float),
+                'order' : np.argsort(self.random.random_sample((num_games, len(effects))), axis=1),
+                'next' : np.zeros(num_games, dtype=np.int64),
+                'holder' : np.full(num_games, -1, dtype=np.int64),
+                'jail_free' : np.flatnonzero(ops == JAIL_FREE)[0]
+            }
+            self.decks.append(deck)
+
+    def __repr__(self):
+        return 'Engine ({} games, {} players)'.format(self.num_games, self.num_players)
+
+    def networth(self, games, players):
+        """Calculate the instantaneous networth of players in games."""
+        owned = self.owner[games] == players[:, None]
+        assets = (owned * (MORTGAGE + BUILD_COST * self.level[games])).sum(axis=1)
+        return self.money[games, players] - self.debt[games, players] + assets
+
+    def credit(self, games, payees, amounts):
+        """Give money to payees: players, the bank or free parking."""
+        players = payees >= 0
+        np.add.at(self.money, (games[players], payees[players]), amounts[players])
+        kitty = payees == FREEPARKING
+        np.add.at(self.freeparking, games[kitty], amounts[kitty])
+
+    def pay(self, games, players, amounts, payees=BANK):
+        """Players pay amounts to payees, liquidating or going bankrupt if short."""
+        if not len(games):
+            return
+        amounts = np.broadcast_to(np.asarray(amounts, dtype=float), games.shape)
+        payees = np.broadcast_to(np.asarray(payees, dtype=np.int64), games.shape)
+        # Rare scalar path, find money for those short on cash
+        for i in np.flatnonzero(self.money[games, players] <= amounts):
+            self.liquidate(games[i], players[i], amounts[i])
+        money = self.money[games, players]
+        solvent = money > amounts
+        paid = np.where(solvent, amounts, money)
+        self.money[games, players] = money - paid
+        self.credit(games, payees, paid)
+        for i in np.flatnonzero(~solvent & (amounts > 0)):
+            self.debt[games[i], players[i]] = amounts[i]
+            self.bankrupt(games[i], players[i])
+
+    def liquidate(self, game, player, amount):
+        """Mortgage then sell buildings of a single player until the amount is raised."""
+        owned = np.flatnonzero(self.owner[game] == player)
+        unmortgaged = (self.owner[game] == player) & ~self.mortgaged[game]
+        monopolies = set(g for g in MONOPOLY_GROUPS if unmortgaged[GROUP_LOCS[g]].all())
+        procedes = 0.0
+        # Mortgage lowest valued, undeveloped, non monopolied properties first
+        while procedes < amount:
+            candidates = [
+                loc for loc in owned
+                if not self.mortgaged[game, loc] and self.level[game, loc] == 0 and GROUP[loc] not in monopolies
+            ]
+            if not candidates:
+                break
+            loc = min(candidates, key=lambda l: MORTGAGE[l])
+            self.mortgaged[game, loc] = True
+            self.money[game, player] += MORTGAGE[loc]
+            procedes += MORTGAGE[loc]
+        # Sell hotels then houses, one building per property per pass
+        for is_hotel in (True, False):
+            for loc in owned:
+                if procedes >= amount:
+                    break
+                if (self.level[game, loc] == MAX_LEVEL) if is_hotel else (self.level[game, loc] > 0):
+                    self.level[game, loc] -= 1
+                    self.money[game, player] += BUILD_COST[loc]
+                    procedes += BUILD_COST[loc]
+
+    def bankrupt(self, game, player):
+        """Remove a player from a game and return their properties."""
+        self.active[game, player] = False
+        self.bankrupt_round[game, player] = self.rounds[game] + 1
+        owned = self.owner[game] == player
+        self.owner[game, owned] = -1
+        self.level[game, owned] = 0
+        self.mortgaged[game, owned] = False
+        for deck in self.decks:
+            if deck['holder'][game] == player:
+                deck['holder'][game] = -1
+        logging.debug('Player %s is bankrupt in Game %s.', player, self.start + game)
+
+    def go_to_jail(self, games, players):
+        """Send players to jail without passing go."""
+        self.position[games, players] = JAIL
+        self.in_jail[games, players] = True
+        self.jail_tries[games, players] = 0
+
+    def advance(self, games, players, spaces, pass_go=True):
+        """Move players to spaces, collecting $200 when passing go, then handle the space."""
+        if pass_go:
+            passed = self.position[games, players] > spaces
+            self.money[games[passed], players[passed]] += 200.0
+        self.position[games, players] = spaces
+        self.handle_space(games, players)
+
+    def rent(self, games, owners, spaces):
+        """Determine the current rent of spaces for their owners."""
+        owned = (self.owner[games] == owners[:, None]) & ~self.mortgaged[games]
+        same_color = (owned & GROUP_MASK[GROUP[spaces]]).sum(axis=1)
+        level = self.level[games, spaces]
+        category = CATEGORY[spaces]
+        base = RENTS[spaces, 0]
+        monopoly = same_color == GROUP_SIZE[GROUP[spaces]]
+        rent = np.where(monopoly & (level == 0), 2.0 * base, np.where(monopoly, RENTS[spaces, level], base))
+        count_rent = RENTS[spaces, np.maximum(same_color - 1, 0)]
+        rent = np.where(category == RAILROAD, count_rent, rent)
+        # Utilities are rent times a fresh dice roll
+        dice = self.random.randint(1, 7, size=(len(games), 2)).sum(axis=1)
+        return np.where(category == UTILITY, dice * count_rent, rent)
+
+    def auction(self, games, spaces):
+        """Auction spaces to all active players, sealed-bid second-price with bids capped by cash."""
+        price = PRICE[spaces]
+        bids = np.maximum(self.random.normal(price[:, None], 0.5 * price[:, None], size=(len(games), self.num_players)), 0.0)
+        bids = np.minimum(bids, self.money[games])
+        bids[~self.active[games]] = -1.0
+        order = np.argsort(-bids, axis=1, kind='mergesort')
+        rows = np.arange(len(games))
+        winners = order[:, 0]
+        second = np.maximum(bids[rows, order[:, 1]], 0.0) if self.num_players > 1 else np.zeros(len(games))
+        # As Game and buy, a winner must have more than the price, otherwise there is no sale
+        won = (bids[rows, winners] > 0.0) & (self.money[games, winners] > second)
+        self.pay(games[won], winners[won], second[won])
+        self.owner[games[won], spaces[won]] = winners[won]
+
+    def buy(self, games, players, spaces):
+        """Buy unowned spaces, or liquidate or auction when short on cash."""
+        price = PRICE[spaces]
+        direct = self.money[games, players] > price
+        liquidate = ~direct & (self.random.random_sample(len(games)) > 0.5)
+        for i in np.flatnonzero(liquidate):
+            self.liquidate(games[i], players[i], price[i])
+            direct[i] = self.money[games[i], players[i]] > price[i]
+        self.money[games[direct], players[direct]] -= price[direct]
+        self.owner[games[direct], spaces[direct]] = players[direct]
+        auction = ~direct & ~liquidate
+        if auction.any():
+            self.auction(games[auction], spaces[auction])
+
+    def draw(self, deck, games):
+        """Draw the next card of a deck in each game, skipping a held "Get out of Jail Free" card."""
+        cards = deck['order'][games, deck['next'][games]]
+        deck['next'][games] = (deck['next'][games] + 1) % len(deck['op'])
+        held = (cards == deck['jail_free']) & (deck['holder'][games] >= 0)
+        if held.any():
+            cards[held] = deck['order'][games[held], deck['next'][games[held]]]
+            deck['next'][games[held]] = (deck['next'][games[held]] + 1) % len(deck['op'])
+        return cards
+
+    def follow(self, deck, games, players):
+        """Draw a card for players and follow its rule."""
+        cards = self.draw(deck, games)
+        op, a, b = deck['op'][cards], deck['a'][cards], deck['b'][cards]
+        m = op == COLLECT
+        self.money[games[m], players[m]] += a[m]
+        m = op == PAY
+        self.pay(games[m], players[m], a[m], FREEPARKING)
+        m = op == REPAIRS
+        if m.any():
+            levels = self.level[games[m]] * (self.owner[games[m]] == players[m][:, None])
+            houses = np.minimum(levels, MAX_HOUSE_LEVEL).sum(axis=1)
+            hotels = (levels == MAX_LEVEL).sum(axis=1)
+            self.pay(games[m], players[m], a[m] * houses + b[m] * hotels, FREEPARKING)
+        for other in xrange(self.num_players):
+            m = (op == PAY_EACH) & (players != other) & self.active[games, other] & self.active[games, players]
+            self.pay(games[m], players[m], a[m], other)
+            m = (op == COLLECT_EACH) & (players != other) & self.active[games, other]
+            self.pay(games[m], np.full(m.sum(), other), a[m], players[m])
+        m = op == JAIL_FREE
+        deck['holder'][games[m]] = players[m]
+        m = op == GO_JAIL
+        self.go_to_jail(games[m], players[m])
+        # Movement cards land on a new space
+        position = self.position[games, players]
+        m = (op == ADVANCE) & self.active[games, players]
+        self.advance(games[m], players[m], a[m].astype(np.int64))
+        m = (op == NEAREST) & self.active[games, players]
+        self.advance(games[m], players[m], NEAREST_TABLE[a[m].astype(np.int64), position[m]])
+        m = (op == MOVE) & self.active[games, players]
+        self.advance(games[m], players[m], (position[m] + a[m].astype(np.int64)) % NUM_PROPERTIES, pass_go=False)
+
+    def handle_space(self, games, players):
+        """Determine what to do on each player's space."""
+        if not len(games):
+            return
+        position = self.position[games, players]
+        # Landing on Go, collect money
+        m = position == GO
+        self.money[games[m], players[m]] += 200.0
+        # Landing on Go to Jail, go to jail without passing Go
+        m = position == GO_TO_JAIL
+        self.go_to_jail(games[m], players[m])
+        # Landing on Luxury or Income Tax, pay indicated amount
+        m = position == LUXURY_TAX
+        self.pay(games[m], players[m], 75.0, FREEPARKING)
+        m = position == INCOME_TAX
+        if m.any():
+            guess = self.random.random_sample(m.sum()) > 0.5
+            tax = np.where(guess, 0.1 * self.networth(games[m], players[m]), 200.0)
+            self.pay(games[m], players[m], tax, FREEPARKING)
+        # Landing on Free Parking, Collect the money
+        m = position == FREE_PARKING
+        self.money[games[m], players[m]] += self.freeparking[games[m]]
+        self.freeparking[games[m]] = 0.0
+        # Landing on a card space, follow card instructions
+        for deck, spaces in zip(self.decks, DECK_SPACES):
+            m = spaces[position]
+            if m.any():
+                self.follow(deck, games[m], players[m])
+        # Land on Property space, Buy Rent or hold
+        m = CATEGORY[position] > CARD
+        games, players, position = games[m], players[m], position[m]
+        owner = self.owner[games, position]
+        m = owner < 0
+        if m.any():
+            self.buy(games[m], players[m], position[m])
+        m = (owner >= 0) & (owner != players) & ~self.mortgaged[games, position]
+        if m.any():
+            self.pay(games[m], players[m], self.rent(games[m], owner[m], position[m]), owner[m])
+
+    def jail_time(self, games, players, doubles):
+        """Make decisions for players in jail. Return which players got out."""
+        released = np.zeros(len(games), dtype=bool)
+        # Use get out of jail free card, if player has one
+        for deck in self.decks:
+            card = ~released & (deck['holder'][games] == players)
+            deck['holder'][games[card]] = -1
+            released |= card
+        # Either roll or pay, unless already tried doubles 3 times
+        can_pay = ~released & (self.money[games, players] > JAIL_COST)
+        roll = can_pay & (self.random.random_sample(len(games)) > 0.5) & (self.jail_tries[games, players] < 3)
+        self.jail_tries[games[roll & ~doubles], players[roll & ~doubles]] += 1
+        paid = can_pay & ~roll
+        self.pay(games[paid], players[paid], JAIL_COST, FREEPARKING)
+        released |= paid | (roll & doubles)
+        # Liquidate some assets to get Jail fee
+        for i in np.flatnonzero(~released & ~can_pay):
+            self.liquidate(games[i], players[i], JAIL_COST)
+            if self.money[games[i], players[i]] > JAIL_COST:
+                self.pay(games[i:i + 1], players[i:i + 1], JAIL_COST, FREEPARKING)
+                released[i] = True
+        self.in_jail[games[released], players[released]] = False
+        self.jail_tries[games[released], players[released]] = 0
+        return released
+
+    def take_turns(self, seat):
+        """The player in seat takes a turn in every unfinished game."""
+        games = np.flatnonzero(~self.done & self.active[:, seat])
+        if not len(games):
+            return
+        players = np.full(len(games), seat)
+        dice = self.random.randint(1, 7, size=(len(games), MAX_DOUBLES + 1, 2))
+        rolls = dice.sum(axis=2)
+        doubles = dice[:, :, 0] == dice[:, :, 1]
+        # Do Jail time or get out, a doubles jail roll is the first roll of the turn
+        moving = ~self.in_jail[games, seat]
+        jailed = np.flatnonzero(~moving)
+        if len(jailed):
+            moving[jailed] = self.jail_time(games[jailed], players[jailed], doubles[jailed, 0])
+        # Reroll while doubles, the final roll moves, max doubles goes to jail
+        doubles_count = np.cumprod(doubles[:, :MAX_DOUBLES], axis=1).sum(axis=1)
+        roll = rolls[np.arange(len(games)), doubles_count]
+        m = moving & (doubles_count >= MAX_DOUBLES)
+        self.go_to_jail(games[m], players[m])
+        m = moving & (doubles_count < MAX_DOUBLES)
+        self.advance(games[m], players[m], (self.position[games[m], seat] + roll[m]) % NUM_PROPERTIES)
+
+    def develop(self):
+        """Monopoly owners build one level on monopolies they can afford."""
+        games = np.flatnonzero(~self.done)
+        owner, mortgaged, levels = self.owner[games], self.mortgaged[games], self.level[games]
+        for group in MONOPOLY_GROUPS:
+            locs = GROUP_LOCS[group]
+            # A group has at most one monopoly owner, so all players develop in one pass
+            owners = owner[:, locs[0]]
+            monopoly = (owners >= 0) & (owner[:, locs] == owners[:, None]).all(axis=1) & ~mortgaged[:, locs].any(axis=1)
+            dev_level = levels[:, locs].min(axis=1)
+            monopoly &= dev_level < MAX_LEVEL
+            if not monopoly.any():
+                continue
+            dev_games, dev_owners, dev_level = games[monopoly], owners[monopoly], dev_level[monopoly]
+            # Develop only the ones at the current minimum development level
+            for loc in locs:
+                build = self.level[dev_games, loc] == dev_level
+                build &= BUILD_COST[loc] < self.risk_tolerance[dev_games, dev_owners] * self.money[dev_games, dev_owners]
+                self.money[dev_games[build], dev_owners[build]] -= BUILD_COST[loc]
+                self.level[dev_games[build], loc] += 1
+
+    def play_games(self, max_rounds=100):
+        """Play all games. Return a DataFrame of game summaries like Game.summary."""
+        self.start_time = datetime.datetime.now()
+        logging.info('Engine starting %s games of %s players at %s', self.num_games, self.num_players, self.start_time)
+        self.done |= self.rounds >= max_rounds - 1
+        while not self.done.all():
+            # Each round all players take a turn, between each turn all players have opportunity to develop
+            for seat in xrange(self.num_players):
+                self.take_turns(seat)
+                self.develop()
+            self.rounds[~self.done] += 1
+            self.done |= (self.active.sum(axis=1) <= 1) | (self.rounds >= max_rounds - 1)
+        self.end_time = datetime.datetime.now()
+        self.elapsed_time = self.end_time - self.start_time
+        logging.info('Engine played %s games in %s s', self.num_games, self.elapsed_time)
+        return self.summary()
+
+    def summary(self):
+        """Summarize all games: winner, rounds, elapsed time, final networths and bankruptcy rounds."""
+        games = np.arange(self.num_games)
+        networths = np.array([
+            self.networth(games, np.full(self.num_games, seat)) for seat in xrange(self.num_players)
+        ]).T
+        elapsed = self.elapsed_time.total_seconds() if self.elapsed_time else 0.0
+        summaries = pd.DataFrame({
+            'game' : self.start + games,
+            'seed' : self.seed,
+            'winner' : networths.argmax(axis=1),
+            'rounds' : self.rounds,
+            # Lockstep games share the wall time evenly
+            'elapsed_time' : elapsed / max(self.num_games, 1)
+        }, columns=['game', 'seed', 'winner', 'rounds', 'elapsed_time'])
+        for seat in xrange(self.num_players):
+            summaries['networth_{}'.format(seat)] = networths[:, seat]
+            summaries['bankrupt_{}'.format(seat)] = self.bankrupt_round[:, seat]
+        return summaries.set_index('game')
@@ -6,15 +6,19 @@ import copy
 import logging
 import datetime
 import textwrap
-import pandas as pd
 import numpy as np
 
-from monopoly.Constants import TOTAL_MONEY, CARD_WIDTH, PROPERTY_INDX, PROPERTY_DEFS, INIT_CASH
-from monopoly.Constants import GO, JAIL
-from monopoly.Constants import ILLINOIS, ST_CHARLES, UTILITIES, RAILROADS, READING, BOARDWALK
+from monopoly.Constants import TOTAL_MONEY, CARD_WIDTH, PROPERTY_INDX, PROPERTY_DEFS, INIT_CASH, NUM_PROPERTIES
+from monopoly.Constants import JAIL_COST, JAIL_FREE, CARD_INDX, CHANCE_CARD_DEFS, COMMUNITY_CHEST_CARD_DEFS
 
+from monopoly.Board import PRICE
 from monopoly.Card import Card
 from monopoly.Property import Property
+from monopoly.Record import Record, CHUNK_ROWS
+from monopoly.Ledger import Ledger, FREEPARKING
+from monopoly.Stream import RandomStream, new_seed, spawn_seed
+from monopoly.Timing import PhaseTimer
+from monopoly.Strategy import Strategy, DEFAULT_STRATEGY
 from monopoly.Player import Player
 from monopoly.Bank import Bank, FreeParking
 
@@ -22,76 +26,129 @@ from monopoly.Bank import Bank, FreeParking
 PROPERTIES = [Property(**dict(zip(PROPERTY_INDX, p))) for p in PROPERTY_DEFS]
 
 # Game Chance and Community Chest Cards
-# Rule functin is called with a tuple of (player, game)
-# pylint:disable=bad-whitespace
-CHANCE_CARDS = [
-    Card('Chance',                               'Advance to Go', lambda p, g, c: p.go_to_space(GO)),
-    Card('Chance',                         'Advance to Illinois', lambda p, g, c: p.go_to_space(ILLINOIS)),
-    Card('Chance',                'Advance to St. Charles Place', lambda p, g, c: p.go_to_space(ST_CHARLES)),
-    Card('Chance',                  'Advance to Nearest Utility', lambda p, g, c: p.go_to_nearest(UTILITIES)),
-    Card('Chance',                 'Advance to Nearest Railroad', lambda p, g, c: p.go_to_nearest(RAILROADS)),
-    Card('Chance',                      'Bank pays you dividend', lambda p, g, c: p.add(50.0, g.bank)),
-    Card('Chance',                        'Get out of Jail Free', lambda p, g, c: p.cards.append(c)),
-    Card('Chance',                            'Go Back 3 Spaces', lambda p, g, c: p.go_to_space(p.position - 3)),
-    Card('Chance',                                  'Go To Jail', lambda p, g, c: p.go_to_space(JAIL, pass_go=False, just_visiting=False)),
-    Card('Chance',                        'Make General Repairs', lambda p, g, c: p.pay(25.0 * p.num_houses + 100.0 * p.num_hotels, g.freeparking)),
-    Card('Chance',                                'Pay Poor Tax', lambda p, g, c: p.pay(15.0, g.freeparking)),
-    Card('Chance',                 'Advance to Reading Railroad', lambda p, g, c: p.go_to_space(READING)),
-    Card('Chance',                        'Advance to Boardwalk', lambda p, g, c: p.go_to_space(BOARDWALK)),
-    Card('Chance', 'You have been elected Chairman of the Board', lambda p, g, c: map(p.pay, [50.0] * len(g.others(p)), g.others(p))),
-    Card('Chance',                  'Your building loan matures', lambda p, g, c: p.add(150.0, g.bank)),
-    Card('Chance',        'You have won a crossword competition', lambda p, g, c: p.add(100.0, g.bank))
-]
-COMMUNITY_CHEST_CARDS = [
-    Card('Chest',                                 'Advance to Go', lambda p, g, c: p.go_to_space(GO)),
-    Card('Chest',                      'Bank Error in Your Favor', lambda p, g, c: p.add(200.0, g.bank)),
-    Card('Chest',                                'Doctor\'s fees', lambda p, g, c: p.pay(50.0, g.freeparking)),
-    Card('Chest',                    'From Sale of Stock You Get', lambda p, g, c: p.add(50.0, g.bank)),
-    Card('Chest',                          'Get out of Jail Free', lambda p, g, c: p.cards.append(c)),
-    Card('Chest',                                    'Go To Jail', lambda p, g, c: p.go_to_space(JAIL, pass_go=False, just_visiting=False)),
-    Card('Chest',                             'Grand Opera Night', lambda p, g, c: map(p.add, [50.0] * len(g.others(p)), g.others(p))),
-    Card('Chest',                          'Holiday Fund Matures', lambda p, g, c: p.add(100.0, g.bank)),
-    Card('Chest',                             'Income Tax Refund', lambda p, g, c: p.add(20.0, g.bank)),
-    Card('Chest',                           'It is Your Birthday', lambda p, g, c: map(p.add, [10.0] * len(g.others(p)), g.others(p))),
-    Card('Chest',                        'Life Insurance Matures', lambda p, g, c: p.add(100.0, g.bank)),
-    Card('Chest',                              'Pay Hospital Fee', lambda p, g, c: p.pay(100.0, g.freeparking)),
-    Card('Chest',                               'Pay School Fees', lambda p, g, c: p.pay(150.0, g.freeparking)),
-    Card('Chest',                       'Receive Consultancy Fee', lambda p, g, c: p.add(25.0, g.bank)),
-    Card('Chest',           'You are Assessed for Street Repairs', lambda p, g, c: p.pay(40.0 * p.num_houses + 115.0 * p.num_hotels, g.freeparking)),
-    Card('Chest', 'You Have Won Second Prize in a Beauty Contest', lambda p, g, c: p.add(10.0, g.bank)),
-    Card('Chest',                                   'You Inherit', lambda p, g, c: p.add(100.0, g.bank))
-]
-# pylint:enable=bad-whitespace
+CHANCE_CARDS = [Card(**dict(zip(CARD_INDX, c))) for c in CHANCE_CARD_DEFS]
+COMMUNITY_CHEST_CARDS = [Card(**dict(zip(CARD_INDX, c))) for c in COMMUNITY_CHEST_CARD_DEFS]
 
 class Game(object):
     """Define the Game Monopoly."""
 
-    def __init__(self, number, num_players, recordData=False):
-        """Initialize a game."""
+    def __init__(self, number, num_players, recordData=False, seed=None, debug=None, timing=False, sink=None, strategies=None,
+                 init_cash=INIT_CASH, jail_cost=JAIL_COST):
+        """
+        Initialize a game. The game's random stream is derived from (seed, number).
+
+        Per event debug logging is only evaluated in debug mode, which defaults to whether DEBUG logging is
+        enabled when the game is created. With timing, call counts and wall time per phase are kept in
+        self.timer and added to the summary. With a sink, recorded data is streamed to it in chunks of
+        CHUNK_ROWS rows, across resets, instead of being kept in memory.
+
+        strategies is one Strategy for every seat or a list with one per seat, the coin flip Strategy by default.
+        init_cash and jail_cost override the rules' starting money and fee to get out of jail.
+        """
         self.number = number
         self.num_players = num_players
-        self.players = [Player(i, self) for i in xrange(num_players)]
-        self.bankrupted = []
+        self.debug = debug if debug is not None else logging.getLogger().isEnabledFor(logging.DEBUG)
+        self.seed = seed if seed is not None else new_seed()
+        self.random = RandomStream(spawn_seed(self.seed, number))
+        self.init_cash = init_cash
+        self.jail_cost = jail_cost
+        if strategies is None or isinstance(strategies, Strategy):
+            strategies = [strategies if strategies is not None else DEFAULT_STRATEGY] * num_players
+        if len(strategies) != num_players:
+            raise ValueError('Expected {} strategies, one per seat, got {}.'.format(num_players, len(strategies)))
+        self.strategies = list(strategies)
+        # Auction valuation tables, seat x space, as multiples of the price
+        self.bid_mean = np.array([strategy.bid_mean for strategy in self.strategies])
+        self.bid_spread = np.array([strategy.bid_spread for strategy in self.strategies])
+        self.seats = [Player(i, self, strategy=self.strategies[i]) for i in xrange(num_players)]
         self.total_money = TOTAL_MONEY
-        self.bank = Bank(TOTAL_MONEY - num_players * INIT_CASH, self)
-        self.freeparking = FreeParking(0.0, self, name='FreeParking', clipmoney=True)
-        self.chance = copy.deepcopy(CHANCE_CARDS)
-        self.community_chest = copy.deepcopy(COMMUNITY_CHEST_CARDS)
-        self.properties = copy.deepcopy(PROPERTIES)
+        self.bank = Bank(TOTAL_MONEY - num_players * init_cash, self)
+        self.freeparking = FreeParking(0.0, self, name='FreeParking', clipmoney=True, account=FREEPARKING)
+        self.ledger = Ledger()
+        # Mutable copies of the Property templates, space -> Property, the rent lists are shared and never change
+        self.deeds = {prop.loc: copy.copy(prop) for prop in PROPERTIES}
+        self.recordData = recordData
+        self.buffer = None
+        if recordData:
+            self.buffer = Record(capacity=CHUNK_ROWS, sink=sink) if sink is not None else Record()
+        self.timer = None
+        if timing:
+            self.instrument()
+        self.setup()
+
+    def instrument(self):
+        """Time the phases of play with a PhaseTimer."""
+        self.timer = PhaseTimer()
+        for plyr in self.seats:
+            self.timer.instrument(plyr, 'roll_dice', 'dice')
+            self.timer.instrument(plyr, 'go_to_space', 'movement')
+            self.timer.instrument(plyr, 'handle_space', 'handle_space')
+            self.timer.instrument(plyr, 'develop', 'develop')
+            self.timer.instrument(plyr, 'liquidate', 'liquidate')
+            self.timer.instrument(plyr, 'follow', 'cards')
+        for prop in self.deeds.itervalues():
+            self.timer.instrument(prop, 'rent', 'rent')
+        self.timer.instrument(self, 'new_property_auction', 'auction')
+        self.timer.instrument(self, 'draw_chance', 'cards')
+        self.timer.instrument(self, 'draw_community_chest', 'cards')
+        if self.buffer is not None:
+            self.timer.instrument(self.buffer, 'append', 'recording')
+            self.timer.instrument(self.buffer, 'to_frame', 'recording')
+        return self
+
+    def setup(self):
+        """Set up the board, cards and counters of a new game on the existing objects."""
+        self.players = list(self.seats)
+        self.bankrupted = []
+        self.ledger.clear()
+        self.properties = [self.deeds[prop.loc] for prop in PROPERTIES]
+        # Ownership index, space -> owning Player
+        self.owners = [None] * NUM_PROPERTIES
+        # Cards never change, so decks share the template Card objects
+        self.chance = list(CHANCE_CARDS)
+        self.community_chest = list(COMMUNITY_CHEST_CARDS)
         self.start_time = 0
         self.end_time = 0
         self.elapsed_time = 0
-        self.recordData = recordData
-        self.record = pd.DataFrame(columns=['game', 'round', 'bank', 'freeparking', 'total', 'open_properties', 'player', 'money', 'properties', 'networth', 'num_houses', 'num_hotels', 'cards'])
+        self.rounds = 0
+        # Seats that may be able to develop, see develop_players
+        self.develop_pending = set()
+        self.record = None
+        if self.buffer is not None and self.buffer.sink is None:
+            self.buffer.clear()
+        if self.timer is not None:
+            self.timer.reset()
         # Shuffle the cards
-        np.random.shuffle(self.chance)
-        np.random.shuffle(self.community_chest)
+        self.random.shuffle(self.chance)
+        self.random.shuffle(self.community_chest)
+        return self
+
+    def reset(self, seed=None, number=None):
+        """
+        Reuse this game's objects for a new game. The new game is identical to Game(number, num_players, seed=seed),
+        number defaults to the current game number.
+        """
+        self.number = number if number is not None else self.number
+        self.seed = seed if seed is not None else new_seed()
+        self.random.reseed(spawn_seed(self.seed, self.number))
+        for prop in self.deeds.itervalues():
+            prop.reset()
+        for plyr in self.seats:
+            plyr.reset()
+        self.bank.reset(TOTAL_MONEY - self.num_players * self.init_cash)
+        self.freeparking.reset(0.0)
+        return self.setup()
 
     @property
     def current_money(self):
         """Determine the Game winner."""
         return self.bank.money + self.freeparking.money + sum([plyr.money for plyr in self.players])
 
+    @property
+    def money_supply(self):
+        """Determine all money held by the banks and every player, including bankrupt ones."""
+        return self.bank.money + self.freeparking.money + sum([plyr.money for plyr in self.seats])
+
     @property
     def ranking(self):
         """Determine the Game rankings."""
@@ -141,45 +198,98 @@ class Game(object):
     def __repr__(self):
         return 'Game {}'.format(self.number)
 
+    def summary(self):
+        """Summarize a played game: seed, winner, rounds, elapsed time, final networths and bankruptcy rounds."""
+        summary = {
+            'game' : self.number,
+            'seed' : self.seed,
+            'winner' : self.winner.number,
+            'rounds' : self.rounds,
+            'elapsed_time' : self.elapsed_time.total_seconds() if self.elapsed_time else 0.0
+        }
+        for plyr in self.players + self.bankrupted:
+            summary['networth_{}'.format(plyr.number)] = plyr.networth
+            summary['bankrupt_{}'.format(plyr.number)] = plyr.bankrupt_round
+        if self.timer is not None:
+            summary.update(self.timer.summary())
+        return summary
+
+    def develop_players(self):
+        """
+        Let the players who received money or whose buildable monopolies changed since the last turn develop, in seat
+        order. Only these events can make develop build anything, so the other players are never looked at. Players
+        that build stay pending, through update_dev_cost, as they may still afford more.
+        """
+        pending = self.develop_pending | self.ledger.credited
+        self.develop_pending = set()
+        self.ledger.credited.clear()
+        for seat in sorted(pending):
+            # Banks have negative accounts
+            if seat >= 0 and self.seats[seat].can_develop():
+                self.seats[seat].develop()
+        return self
+
+    def check_owners(self):
+        """Check the ownership index against the players' deeds, no bankrupt player may own any. Return True if they agree."""
+        owners = [None] * NUM_PROPERTIES
+        for plyr in self.players:
+            for prop in plyr.properties:
+                owners[prop.loc] = plyr
+        bankrupt_owners = [plyr.number for plyr in self.bankrupted if plyr.properties]
+        if owners != self.owners or bankrupt_owners:
+            logging.warning('Game %s ownership index does not match the deeds (bankrupt owners: %s), this should not happen.', self.number, bankrupt_owners)
+            return False
+        return True
+
     def others(self, player=None):
         """Return the other players."""
         return [plyr for plyr in self.players if plyr is not player]
 
     def get_property(self, number=0):
         """Get a property position from Game's property list."""
-        indx = [i for i, prop in enumerate(self.properties) if number == prop.loc]
-        return self.properties.pop(indx[0]) if indx else None
+        prop = self.deeds.get(number)
+        if prop is None or self.owners[number] is not None:
+            return None
+        self.properties.remove(prop)
+        return prop
 
-    @staticmethod
-    def auction(bidders=None, number=0, what='new', min_bid=0, max_bid=1e7):
-        """Allow subset of players to have auction and bid things."""
-        current_bid = 0
-        bidders = copy.copy(bidders)
-        # Bid until only one bidder left
-        while len(bidders) > 1:
-            for i, plyr in enumerate(bidders):
-                bid = plyr.bid(number, what, min_bid, max_bid)
-                if bid > current_bid:
-                    current_bid = bid
-                    logging.debug('Player %s has the current bid ($%s).', plyr.number, current_bid)
-                if bid < current_bid:
-                    bidders.pop(i)
-                    logging.debug('Player %s bid too low, done bidding ($%s < $%s).', plyr.number, bid, current_bid)
-        return (bidders[0], current_bid)
+    def auction(self, bidders=None, number=0, what='new', min_bid=0, max_bid=1e7):
+        """
+        Hold a sealed-bid second-price auction in one step. Every bidder values the property at once, from its
+        strategy's bid tables, bids are capped by the bidder's cash, and the highest bidder wins at the second highest
+        bid (ties go to the earlier bidder). Return (winner, price), or (None, 0) if no one can pay.
+        """
+        price = PRICE[number]
+        seats = [plyr.number for plyr in bidders]
+        valuations = self.random.normal(price * self.bid_mean[seats, number], price * self.bid_spread[seats, number], len(bidders))
+        bids = np.minimum(np.clip(valuations, min_bid, max_bid), [plyr.money for plyr in bidders])
+        order = np.argsort(-bids, kind='mergesort')
+        if not len(bids) or bids[order[0]] <= 0.0:
+            if self.debug:
+                logging.debug('No one can pay for %s (%s), auction has no winner.', self.deeds[number].name, what)
+            return (None, 0)
+        winner = bidders[order[0]]
+        second = bids[order[1]] if len(bids) > 1 else min_bid
+        if self.debug:
+            logging.debug('Player %s has the highest bid ($%s), pays the second highest ($%s).', winner.number, bids[order[0]], second)
+        return (winner, max(float(second), min_bid))
 
     def new_property_auction(self, number=0):
         """Hold auction for new properties."""
         # Hold auction
         highest_bidder, highest_bid = self.auction(self.players, number)
-        # Best bidder buys property
-        logging.debug('Player %s won the bid at $%s.', highest_bidder.number, highest_bid)
+        # Best bidder buys property, or it stays with the bank
+        if highest_bidder is None:
+            return
+        if self.debug:
+            logging.debug('Player %s won the bid at $%s.', highest_bidder.number, highest_bid)
         highest_bidder.buy_property(number, highest_bid)
 
     @staticmethod
     def draw_card(deck=None):
         """Draw a card from the top of a deck then replace it on the bottom. Return the card."""
         card = deck.pop(0)
-        if card.name != 'Get out of Jail Free':
+        if card.op != JAIL_FREE:
             deck.append(card)
         return card
 
@@ -192,50 +302,66 @@ class Game(object):
         return self.draw_card(self.community_chest)
 
     def play_game(self, max_rounds=100):
-        """Play the game."""
+        """Play the game. Return the per turn record, or None if not recording data or streaming it to a sink."""
         self.start_time = datetime.datetime.now()
         logging.info('Game %s starting at %s', self.number, self.start_time)
         rounds = 1
         while len(self.players) > 1 and rounds < max_rounds:
-            logging.debug('Starting round %s. Bank: $%s, Freeparking: $%s, props: %s, Players: %s, Total Money: $%s', rounds, self.bank.money, self.freeparking.money, len(self.properties), len(self.players), self.current_money)
+            if self.debug:
+                logging.debug('Starting round %s. Bank: $%s, Freeparking: $%s, props: %s, Players: %s, Total Money: $%s', rounds, self.bank.money, self.freeparking.money, len(self.properties), len(self.players), self.current_money)
             # Each round all players take a turn
             for plyr in self.players:
                 plyr.take_turn()
-                # Between each turn, all players have opportunity to develop
-                for plyr_dev in self.players:
-                    plyr_dev.develop()
+                # Between each turn, players whose cash or monopolies changed have opportunity to develop
+                if self.develop_pending or self.ledger.credited:
+                    self.develop_players()
+                # Check the players' running totals and the ownership index in debug mode
+                if self.debug:
+                    for plyr_check in self.players + self.bankrupted:
+                        plyr_check.check_counters()
+                    self.check_owners()
 
                 # Record data if need be
                 if self.recordData:
-                    self.record = self.record.append({
-                        'game' : self.number,
-                        'round' : rounds,
-                        'bank' : self.bank.money,
-                        'freeparking' : self.freeparking.money,
-                        'total' : self.current_money,
-                        'open_properties' : len(self.properties),
-                        'player' : plyr.number,
-                        'money' : plyr.money,
-                        'properties' : len(plyr.properties),
-                        'networth' : plyr.networth,
-                        'num_houses' : plyr.num_houses,
-                        'num_hotels' : plyr.num_hotels,
-                        'cards' : len(plyr.properties)
-                    }, ignore_index=True)
-
-            logging.debug('Ending round %s. Bank: $%s, Freeparking: $%s, props: %s, Players: %s, Total Money: $%s', rounds, self.bank.money, self.freeparking.money, len(self.properties), len(self.players), self.current_money)
-            if int(round(int(round(self.current_money)) % int(round(self.total_money)))) != 0:
-                logging.warning('Current Money ($%s) is not evenly divisible by Total Money ($%s), it is x%s times, this should not happen.', self.current_money, self.total_money, (self.current_money / self.total_money))
+                    # Row values in RECORD_COLUMNS order
+                    self.buffer.append(
+                        self.number,
+                        rounds,
+                        self.bank.money,
+                        self.freeparking.money,
+                        self.current_money,
+                        len(self.properties),
+                        plyr.number,
+                        plyr.money,
+                        len(plyr.properties),
+                        plyr.networth,
+                        plyr.num_houses,
+                        plyr.num_hotels,
+                        len(plyr.properties)
+                    )
+
+            if self.debug:
+                logging.debug('Ending round %s. Bank: $%s, Freeparking: $%s, props: %s, Players: %s, Total Money: $%s', rounds, self.bank.money, self.freeparking.money, len(self.properties), len(self.players), self.current_money)
+            # Money only moves through the ledger, so it is conserved by construction, check it in debug mode
+            if self.debug and abs(self.money_supply - self.total_money - self.ledger.minted) > 1e-6:
+                logging.warning(
+                    'Money supply ($%s) is not Total Money ($%s) plus minted money ($%s), this should not happen.',
+                    self.money_supply, self.total_money, self.ledger.minted
+                )
+            self.rounds = rounds
             rounds += 1
-        self.record.index.name = 'turn'
+        if self.recordData and self.buffer.sink is None:
+            self.record = self.buffer.to_frame()
         self.end_time = datetime.datetime.now()
         self.elapsed_time = self.end_time - self.start_time
-        logging.info('Game %s ended at %s', self.number, self.end_time)
-        if rounds >= max_rounds:
-            logging.info('Game %s ended due to Max Rounds (%s).', self.number, max_rounds)
-        else:
-            logging.info('Game %s had %s rounds played.', self.number, rounds)
-            logging.info('Game %s ended due to bankruptcy.', self.number, )
-        logging.info('Player %s is the winner of Game %s!', self.winner.number, self.number)
-        logging.info('Game %s took %s s', self.number, self.elapsed_time)
+        # Ranking the winner sorts every player by networth, only do it if the logs are kept
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info('Game %s ended at %s', self.number, self.end_time)
+            if rounds >= max_rounds:
+                logging.info('Game %s ended due to Max Rounds (%s).', self.number, max_rounds)
+            else:
+                logging.info('Game %s had %s rounds played.', self.number, rounds)
+                logging.info('Game %s ended due to bankruptcy.', self.number)
+            logging.info('Player %s is the winner of Game %s!', self.winner.number, self.number)
+            logging.info('Game %s took %s s', self.number, self.elapsed_time)
         return self.record
@@ -0,0 +1,100 @@
+"""
+Ledger.py - File for defining a Ledger class.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Accounts other than players, which are their seat numbers
+BANK, FREEPARKING, MINT = -1, -2, -3
+
+# Transfer reasons
+OTHER, RENT, TAX, GO_SALARY, CARD, BUILDING, MORTGAGE, PROPERTY_SALE, JAIL_FEE, KITTY, TURNOVER = range(11)
+REASONS = ['other', 'rent', 'tax', 'go', 'card', 'building', 'mortgage', 'property', 'jail', 'freeparking', 'turnover']
+
+class Ledger(object):
+    """
+    Defines the record of every money transfer in a game, as growable arrays of payer, payee, amount and reason.
+    All money moves through transfer, so every debit has its credit and balances stay consistent by construction.
+    """
+
+    def __init__(self, capacity=1024):
+        """Initialize a ledger."""
+        self.capacity = capacity
+        self.size = 0
+        self.minted = 0.0
+        # Accounts credited since the set was last emptied
+        self.credited = set()
+        self.payer = np.empty(capacity, dtype=np.int64)
+        self.payee = np.empty(capacity, dtype=np.int64)
+        self.amount = np.empty(capacity, dtype=np.float64)
+        self.reason = np.empty(capacity, dtype=np.int8)
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return 'Ledger ({} transfers)'.format(self.size)
+
+    def grow(self):
+        """Double the capacity of the ledger."""
+        self.capacity *= 2
+        for name in ('payer', 'payee', 'amount', 'reason'):
+            array = getattr(self, name)
+            grown = np.empty(self.capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            setattr(self, name, grown)
+        return self
+
+    def clear(self):
+        """Empty the ledger, keeping its capacity."""
+        self.size = 0
+        self.minted = 0.0
+        self.credited.clear()
+        return self
+
+    def record(self, payer=0, payee=0, amount=0.0, reason=OTHER):
+        """Record a transfer between accounts."""
+        if self.size == self.capacity:
+            self.grow()
+        self.payer[self.size] = payer
+        self.payee[self.size] = payee
+        self.amount[self.size] = amount
+        self.reason[self.size] = reason
+        self.size += 1
+        return self
+
+    def transfer(self, payer=None, payee=None, amount=0.0, reason=OTHER):
+        """Move an amount of money from payer to payee and record it."""
+        payer.money -= amount
+        payee.money += amount
+        self.credited.add(payee.account)
+        return self.record(payer.account, payee.account, amount, reason)
+
+    def mint(self, payee=None, amount=0.0):
+        """Create new money for payee, as a bank that ran out does."""
+        payee.money += amount
+        self.minted += amount
+        self.credited.add(payee.account)
+        return self.record(MINT, payee.account, amount, TURNOVER)
+
+    def to_frame(self):
+        """Convert the transfers to a DataFrame."""
+        transfers = pd.DataFrame({
+            'payer' : self.payer[:self.size],
+            'payee' : self.payee[:self.size],
+            'amount' : self.amount[:self.size],
+            'reason' : pd.Categorical.from_codes(self.reason[:self.size], REASONS)
+        }, columns=['payer', 'payee', 'amount', 'reason'])
+        transfers.index.name = 'transfer'
+        return transfers
+
+    def totals(self):
+        """Return the total amount transferred for each reason."""
+        totals = np.bincount(self.reason[:self.size], weights=self.amount[:self.size], minlength=len(REASONS))
+        return pd.Series(totals, index=REASONS, name='amount')
+
+    def balance(self, account=0):
+        """Return the net amount an account received."""
+        amount = self.amount[:self.size]
+        return amount[self.payee[:self.size] == account].sum() - amount[self.payer[:self.size] == account].sum()
@@ -0,0 +1,149 @@
+"""
+Markov.py - Functions for the analytic landing probabilities and expected rents of the board.
+"""
+
+import numpy as np
+import pandas as pd
+
+from monopoly.Constants import MAX_DOUBLES, MAX_LEVEL, MAX_HOUSE_LEVEL, NUM_PROPERTIES, SPACE, PROPERTY_DEFS
+from monopoly.Constants import JAIL, GO_TO_JAIL, CHANCE, COMMUNITY_CHEST, ADVANCE, NEAREST, MOVE, GO_JAIL
+from monopoly.Board import CATEGORY, RAILROAD, UTILITY
+from monopoly.Engine import CHANCE_EFFECTS, COMMUNITY_CHEST_EFFECTS, NEAREST_TABLE
+
+# Failed doubles tries before a player must pay out of jail
+MAX_JAIL_TRIES = 3
+# Chance of paying rather than rolling to get out of jail, as Player.jail_pay_or_roll
+JAIL_PAY = 0.5
+
+# States are the board spaces, Jail being just visiting, then in jail after 0 to MAX_JAIL_TRIES failed tries
+IN_JAIL = NUM_PROPERTIES
+NUM_STATES = NUM_PROPERTIES + MAX_JAIL_TRIES + 1
+STATE_NAMES = [SPACE[loc][0] for loc in xrange(NUM_PROPERTIES)] + ['In Jail ({} tries)'.format(t) for t in xrange(MAX_JAIL_TRIES + 1)]
+
+# Expected dice roll, for utility rents
+EXPECTED_ROLL = 7.0
+
+def dice_distribution():
+    """Return the probabilities of a non double roll totalling 0 to 12, and of rolling doubles."""
+    nondoubles = np.zeros(13)
+    for dice1 in xrange(1, 7):
+        for dice2 in xrange(1, 7):
+            if dice1 != dice2:
+                nondoubles[dice1 + dice2] += 1.0 / 36.0
+    return nondoubles, 1.0 / 6.0
+
+def resolve(space=0, prob=1.0, landings=None, ends=None):
+    """
+    Land on a space with probability prob, following Go To Jail and card movement. Add the landings
+    to landings (per space) and the probability of ending the turn in each state to ends.
+    """
+    landings[space] += prob
+    if space == GO_TO_JAIL:
+        landings[JAIL] += prob
+        ends[IN_JAIL] += prob
+        return
+    if space in CHANCE or space in COMMUNITY_CHEST:
+        effects = CHANCE_EFFECTS if space in CHANCE else COMMUNITY_CHEST_EFFECTS
+        share = prob / len(effects)
+        for op, a, _ in effects:
+            if op == ADVANCE:
+                resolve(a, share, landings, ends)
+            elif op == NEAREST:
+                resolve(NEAREST_TABLE[a, space], share, landings, ends)
+            elif op == MOVE:
+                resolve((space + a) % NUM_PROPERTIES, share, landings, ends)
+            elif op == GO_JAIL:
+                landings[JAIL] += share
+                ends[IN_JAIL] += share
+            else:
+                ends[space] += share
+        return
+    ends[space] += prob
+
+def roll_and_move(space=0, doubles_count=0, prob=1.0, landings=None, ends=None):
+    """
+    Play the rolling part of a turn from space, having already rolled doubles_count doubles. As in
+    Player.take_turn, doubles are rolled again and only the last roll moves the player.
+    """
+    nondoubles, doubles = dice_distribution()
+    repeat = sum(doubles ** k for k in xrange(MAX_DOUBLES - doubles_count))
+    for roll in xrange(2, 13):
+        if nondoubles[roll]:
+            resolve((space + roll) % NUM_PROPERTIES, prob * repeat * nondoubles[roll], landings, ends)
+    # Too many doubles in a row
+    jailed = prob * doubles ** (MAX_DOUBLES - doubles_count)
+    landings[JAIL] += jailed
+    ends[IN_JAIL] += jailed
+
+def transition_matrix():
+    """
+    Build the turn to turn transition matrix between states and the expected landings on each space
+    during a turn from each state. Every card is equally likely and "Get out of Jail Free" cards are
+    never kept, so a player in jail pays or rolls.
+    """
+    transitions = np.zeros((NUM_STATES, NUM_STATES))
+    landings = np.zeros((NUM_STATES, NUM_PROPERTIES))
+    for state in xrange(NUM_STATES):
+        tries = state - IN_JAIL
+        if tries < 0:
+            roll_and_move(state, 0, 1.0, landings[state], transitions[state])
+        elif tries < MAX_JAIL_TRIES:
+            _, doubles = dice_distribution()
+            # Pay and take a normal turn
+            roll_and_move(JAIL, 0, JAIL_PAY, landings[state], transitions[state])
+            # Roll doubles to get out and keep rolling, or stay in
+            roll_and_move(JAIL, 1, (1.0 - JAIL_PAY) * doubles, landings[state], transitions[state])
+            transitions[state, state + 1] += (1.0 - JAIL_PAY) * (1.0 - doubles)
+        else:
+            roll_and_move(JAIL, 0, 1.0, landings[state], transitions[state])
+    return transitions, landings
+
+def stationary_distribution(transitions=None):
+    """Solve for the long run probability of each state at the end of a turn."""
+    transitions = transitions if transitions is not None else transition_matrix()[0]
+    n = len(transitions)
+    # pi (T - I) = 0 with one equation replaced by sum(pi) = 1
+    system = transitions.T - np.eye(n)
+    system[-1] = 1.0
+    rhs = np.zeros(n)
+    rhs[-1] = 1.0
+    return np.linalg.solve(system, rhs)
+
+def landing_probabilities():
+    """Return a DataFrame of the long run end of turn probability and expected landings per turn of every space."""
+    transitions, landings = transition_matrix()
+    states = stationary_distribution(transitions)
+    position = states[:NUM_PROPERTIES].copy()
+    position[JAIL] += states[IN_JAIL:].sum()
+    board = pd.DataFrame({
+        'name' : [SPACE[loc][0] for loc in xrange(NUM_PROPERTIES)],
+        'position' : position,
+        'in_jail' : np.where(np.arange(NUM_PROPERTIES) == JAIL, states[IN_JAIL:].sum(), 0.0),
+        'landings' : states.dot(landings)
+    }, columns=['name', 'position', 'in_jail', 'landings'])
+    board.index.name = 'loc'
+    return board
+
+def rent_levels(loc=0, rents=None):
+    """Return the (level, rent) schedule of the property on space loc, as in Property.rent."""
+    if CATEGORY[loc] == UTILITY:
+        return [('owned{}'.format(i + 1), EXPECTED_ROLL * rent) for i, rent in enumerate(rents)]
+    elif CATEGORY[loc] == RAILROAD:
+        return [('owned{}'.format(i + 1), rent) for i, rent in enumerate(rents)]
+    levels = [('base', rents[0]), ('monopoly', 2.0 * rents[0])]
+    levels += [('house{}'.format(i), rents[i]) for i in xrange(1, MAX_HOUSE_LEVEL + 1)]
+    levels.append(('hotel', rents[MAX_LEVEL]))
+    return levels
+
+def expected_rents():
+    """
+    Return a DataFrame of the expected rent an opponent pays per turn for every property at each
+    development level, indexed by (name, level). Railroad and utility levels are the number owned.
+    """
+    landings = landing_probabilities()['landings']
+    rows = []
+    for name, color, loc, _, rents, _, _ in PROPERTY_DEFS:
+        for level, rent in rent_levels(loc, rents):
+            rows.append((name, level, loc, color, landings[loc], float(rent), landings[loc] * rent))
+    rents = pd.DataFrame(rows, columns=['name', 'level', 'loc', 'color', 'landings', 'rent', 'expected_rent'])
+    return rents.set_index(['name', 'level'])
@@ -3,46 +3,83 @@ Player.py - File for defining a Player class.
 """
 
 import logging
-import numpy as np
 
-from monopoly.Constants import CARD_WIDTH, MAX_LEVEL, MAX_HOUSE_LEVEL, MAX_DOUBLES, JAIL_COST, NUM_PROPERTIES, INIT_CASH
+from monopoly.Constants import CARD_WIDTH, MAX_LEVEL, MAX_HOUSE_LEVEL, MAX_DOUBLES, NUM_PROPERTIES
 from monopoly.Constants import COLOR_COUNTS, COLOR_PROPERTIES, PROPERTY_PRICES, PROPERTY_NAMES, SPACE
+from monopoly.Constants import COLORS, MONOPOLY_MASK
+from monopoly.Board import PROPERTY, BUILD_COST, GROUP_LOCS
+from monopoly.Strategy import DEFAULT_STRATEGY
+from monopoly.Ledger import OTHER, RENT, TAX, GO_SALARY, CARD, BUILDING, MORTGAGE, PROPERTY_SALE, JAIL_FEE, KITTY
 from monopoly.Constants import GO, JAIL, GO_TO_JAIL, LUXURY_TAX, INCOME_TAX, FREE_PARKING, COMMUNITY_CHEST, CHANCE
+from monopoly.Constants import ADVANCE, NEAREST, MOVE, COLLECT, PAY, PAY_EACH, COLLECT_EACH, REPAIRS, GO_JAIL, JAIL_FREE, NEAREST_SPACES
 
 class Player(object):
     """Defines a Player of the Game."""
 
-    def __init__(self, number, game, risk_tol=None):
-        """Initialize a player."""
+    def __init__(self, number, game, risk_tol=None, strategy=None):
+        """Initialize a player. Decisions are made by strategy, the coin flip Strategy by default."""
         self.number = number
+        self.account = number
         self.game = game
+        self.risk_tol = risk_tol
+        self.strategy = strategy if strategy is not None else DEFAULT_STRATEGY
+        self.reset()
+
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info('Player %s is created (M: $%s, D: $%s, NW: $%s).', self.number, self.money, self.debt, self.networth)
+
+    def reset(self):
+        """Reset the player for a new game."""
         self.position = 0
-        self.money = INIT_CASH
+        self.money = self.game.init_cash
         self.debt = 0.0
         self.properties = []
+        # Unmortgaged properties per color group and bitmask of monopolized groups
+        self.color_counts = [0] * len(COLORS)
+        self.monopolies = 0
+        # Running totals of the deeds' value, houses and hotels
+        self.assets = 0
+        self.house_count = 0
+        self.hotel_count = 0
+        # Cheapest building cost of a monopoly that is not fully developed
+        self.dev_cost = float('inf')
         self.cards = []
         self.turn = 0
         self.round = 1
-        self.risk_tolerance = risk_tol if risk_tol else np.random.normal(0.75, 0.1)
+        self.risk_tolerance = self.risk_tol if self.risk_tol else self.strategy.risk_tolerance(self)
         self.just_visiting = True
         self.jail_double_try = 0
-
-        logging.info('Player %s is created (M: $%s, D: $%s, NW: $%s).', self.number, self.money, self.debt, self.networth)
+        # Round the player went bankrupt in, 0 while playing
+        self.bankrupt_round = 0
+        return self
 
     @property
     def networth(self):
         """Calculate the instantaneous networth of the player."""
-        return self.money - self.debt + sum([p.value for p in self.properties])
+        return self.money - self.debt + self.assets
 
     @property
     def num_houses(self):
         """Calculate the instantaneous number of houses a player has."""
-        return sum([p.houses for p in self.properties])
+        return self.house_count
 
     @property
     def num_hotels(self):
         """Calculate the instantaneous number of hotels a player has."""
-        return sum([p.hotels for p in self.properties])
+        return self.hotel_count
+
+    def check_counters(self):
+        """Check the running totals against a full recount of the deeds. Return True if they agree."""
+        assets = sum([p.value for p in self.properties])
+        houses = sum([p.houses for p in self.properties])
+        hotels = sum([p.hotels for p in self.properties])
+        if (assets, houses, hotels) != (self.assets, self.house_count, self.hotel_count):
+            logging.warning(
+                'Player %s counters (assets $%s, %s houses, %s hotels) do not match the deeds (assets $%s, %s houses, %s hotels), this should not happen.',
+                self.number, self.assets, self.house_count, self.hotel_count, assets, houses, hotels
+            )
+            return False
+        return True
 
     @property
     def bankrupt(self):
@@ -77,88 +114,166 @@ class Player(object):
     def __repr__(self):
         return 'Player {}'.format(self.number)
 
-    @staticmethod
-    def roll_dice():
+    def roll_dice(self):
         """Roll two dice with uniform randomness.  Return dice sum and doubles boolean."""
-        dice1 = np.random.randint(1, 6)
-        dice2 = np.random.randint(1, 6)
+        dice1, dice2 = self.game.random.roll()
         return dice1 + dice2, dice1 == dice2, (dice1, dice2)
 
-    @staticmethod
-    def bid(number=0, what=None, min_bid=0, max_bid=1e7):
-        """Make a bid on a property."""
-        price = PROPERTY_PRICES[number]
-        price_bid = np.random.normal(price, 0.5 * price)
-        return min(max(price_bid, min_bid), max_bid)
-
-    @staticmethod
-    def jail_pay_or_roll():
+    def jail_pay_or_roll(self):
         """Pay or roll to get out of jail."""
-        r = np.random.rand()
-        return 0 if r > 0.5 else 1
+        return self.strategy.jail_pay_or_roll(self)
 
     def owns(self, number=0):
         """Check if player owns a property position."""
-        return number in [p.loc for p in self.properties]
+        return self.game.owners[number] is self
 
     def get_property(self, number=0):
         """Find the property in the player's deeds. Assumes ownership is already determined."""
-        prop = [prop for prop in self.properties if number == prop.loc]
-        return prop[0] if prop else None
+        return self.game.deeds[number] if self.owns(number) else None
 
     def pop_property(self, number=0):
         """Find a property position in the player's deed list. Removes from list"""
-        indx = [i for i, prop in enumerate(self.properties) if number == prop.loc]
-        return self.properties.pop(indx[0]) if indx else None
+        if not self.owns(number):
+            return None
+        prop = self.game.deeds[number]
+        self.properties.remove(prop)
+        self.game.owners[number] = None
+        if not prop.mortgaged:
+            self.count_color(prop, -1)
+        self.count_assets(prop, -1)
+        return prop
+
+    def add_property(self, prop=None):
+        """Add a property to the player's deed list and the Game's ownership index."""
+        self.properties.append(prop)
+        self.game.owners[prop.loc] = self
+        if not prop.mortgaged:
+            self.count_color(prop, 1)
+        self.count_assets(prop, 1)
+        return self
 
-    def add(self, amount=0.0, addfrom=None):
-        """Add an amount of money from someone."""
-        self.money += amount
+    def count_assets(self, prop=None, change=0):
+        """Add (change=1) or remove (change=-1) a property's value and buildings from the running totals."""
+        self.assets += change * prop.value
+        self.house_count += change * prop.houses
+        self.hotel_count += change * prop.hotels
+        return self
+
+    def build_house(self, prop=None):
+        """Put a house on a property."""
+        prop.houses += 1
+        self.house_count += 1
+        self.assets += prop.cost
+        return self.update_dev_cost()
+
+    def build_hotel(self, prop=None):
+        """Put a hotel on a property."""
+        prop.hotels += 1
+        self.hotel_count += 1
+        self.assets += prop.cost
+        return self.update_dev_cost()
+
+    def sell_house(self, prop=None):
+        """Take a house off a property."""
+        prop.houses -= 1
+        self.house_count -= 1
+        self.assets -= prop.cost
+        return self.update_dev_cost()
+
+    def sell_hotel(self, prop=None):
+        """Take a hotel off a property."""
+        prop.hotels -= 1
+        self.hotel_count -= 1
+        self.assets -= prop.cost
+        return self.update_dev_cost()
+
+    def mortgage_property(self, prop=None):
+        """Mark an owned property as mortgaged."""
+        if not prop.mortgaged:
+            prop.mortgaged = True
+            self.count_color(prop, -1)
+        return self
+
+    def count_color(self, prop=None, change=0):
+        """Update the unmortgaged count of a property's color group and the monopoly bitmask."""
+        bit = 1 << prop.group
+        self.color_counts[prop.group] += change
+        if bit & MONOPOLY_MASK and self.color_counts[prop.group] == COLOR_COUNTS[prop.color]:
+            self.monopolies |= bit
+        else:
+            self.monopolies &= ~bit
+        return self.update_dev_cost()
+
+    def update_dev_cost(self):
+        """Find the cheapest building cost among monopolies that are not fully developed."""
+        self.dev_cost = float('inf')
+        if self.monopolies:
+            deeds = self.game.deeds
+            for group, locs in enumerate(GROUP_LOCS):
+                if self.monopolies & (1 << group) and BUILD_COST[locs[0]] < self.dev_cost:
+                    if min([deeds[loc].level for loc in locs]) < MAX_LEVEL:
+                        self.dev_cost = BUILD_COST[locs[0]]
+            # A new or changed monopoly may now be built on
+            if self.dev_cost < float('inf'):
+                self.game.develop_pending.add(self.number)
+        return self
+
+    def can_develop(self):
+        """Check if develop would build anything, without looking at the properties."""
+        return self.dev_cost < self.risk_tolerance * self.money
+
+    def add(self, amount=0.0, addfrom=None, reason=OTHER):
+        """Add an amount of money from someone, who pays it."""
         if addfrom:
-            addfrom.pay(amount)
+            addfrom.pay(amount, self, reason)
+        else:
+            self.money += amount
+            self.game.develop_pending.add(self.number)
         return self
 
-    def pay(self, amount=0.0, payto=None):
+    def pay(self, amount=0.0, payto=None, reason=OTHER):
         """Pay an amount of money to someone."""
         # Pay if player has enough money
         if self.money > amount:
-            self.money -= amount
-            if payto:
-                payto.add(amount)
+            self.game.ledger.transfer(self, payto, amount, reason)
         # Check for liquidate money
         else:
-            logging.debug(
-                'Player %s does not have enough money to pay $%s (M: $%s, D: $%s, NW: $%s).',
-                self.number, amount, self.money, self.debt, self.networth
-            )
-            logging.debug(
-                'Player %s has %s properties, %s hotels, %s houses, %s cards and %s networth (M: $%s, D: $%s, NW: $%s).',
-                self.number, len(self.properties), self.num_hotels, self.num_houses, len(self.cards), self.networth,
-                self.money, self.debt, self.networth
-            )
+            if self.game.debug:
+                logging.debug(
+                    'Player %s does not have enough money to pay $%s (M: $%s, D: $%s, NW: $%s).',
+                    self.number, amount, self.money, self.debt, self.networth
+                )
+                logging.debug(
+                    'Player %s has %s properties, %s hotels, %s houses, %s cards and %s networth (M: $%s, D: $%s, NW: $%s).',
+                    self.number, len(self.properties), self.num_hotels, self.num_houses, len(self.cards), self.networth,
+                    self.money, self.debt, self.networth
+                )
             # Look for enough money until you have it or run out of things to sell
             self.liquidate(amount)
             # Pay the amount owed or the money you have
             if self.money > amount:
-                self.money -= amount
-                if payto:
-                    payto.add(amount)
+                self.game.ledger.transfer(self, payto, amount, reason)
             else:
-                if payto:
-                    payto.add(self.money)
+                self.game.ledger.transfer(self, payto, self.money, reason)
                 self.money = 0.0
                 self.debt = amount - self.money
-            # Check for bankruptcy
-            if self.bankrupt:
+            # Check for bankruptcy, once
+            if self.bankrupt and self in self.game.players:
                 # Look up player
                 bankrupt_player_index = [indx for indx, plyr in enumerate(self.game.players) if plyr.number == self.number]
                 # Remove player from game
                 self.game.bankrupted.append(self.game.players.pop(bankrupt_player_index[0]))
+                self.bankrupt_round = self.game.rounds + 1
                 # Reset properties
                 for prop in self.properties:
                     prop.hotels = 0
                     prop.houses = 0
                     prop.mortgaged = False
+                    self.game.owners[prop.loc] = None
+                self.color_counts = [0] * len(COLORS)
+                self.monopolies = 0
+                self.assets, self.house_count, self.hotel_count = 0, 0, 0
+                self.dev_cost = float('inf')
                 # Transfer player properties back to Game
                 self.game.properties = self.game.properties + self.properties
                 self.properties = []
@@ -169,15 +284,22 @@ class Player(object):
     def buy_property(self, number=None, price=None):
         """Purchase a property. Pay money to bank and take property from Game list."""
         number = number if number else self.position
+        deed = self.game.deeds.get(number)
+        price = price if price is not None else deed.price if deed else 0.0
+        # Paying more than the player has could bankrupt them, and a bankrupt player must not take the deed
+        if self.money <= price:
+            if self.game.debug:
+                logging.debug('Player %s cannot pay $%s for %s. (M: $%s)', self.number, price, number, self.money)
+            return self
         prop = self.game.get_property(number)
         if prop:
-            price = price if price else prop.price
-            self.pay(price, self.game.bank)
-            self.properties.append(prop)
-            logging.debug(
-                'Player %s purchases %s for $%s. (M: $%s, D: $%s, NW: $%s)',
-                self.number, prop.name, price, self.money, self.debt, self.networth
-            )
+            self.pay(price, self.game.bank, PROPERTY_SALE)
+            self.add_property(prop)
+            if self.game.debug:
+                logging.debug(
+                    'Player %s purchases %s for $%s. (M: $%s, D: $%s, NW: $%s)',
+                    self.number, prop.name, price, self.money, self.debt, self.networth
+                )
         else:
             logging.warning(
                 'This should not happen, if property (number=%s) is not in Game list, somebody should own it.',
@@ -186,69 +308,58 @@ class Player(object):
         return self
 
     def follow(self, card=None):
-        """Follow the rules of a card."""
-        card.rule(self, self.game, card)
-        logging.debug(
-            'Player %s followed %s card. (M: $%s, D: $%s, NW: $%s)',
-            self.number, card.name, self.money, self.debt, self.networth
-        )
+        """Follow the rules of a card, by its op code."""
+        CARD_RULES[card.op](self, card)
+        if self.game.debug:
+            logging.debug(
+                'Player %s followed %s card. (M: $%s, D: $%s, NW: $%s)',
+                self.number, card.name, self.money, self.debt, self.networth
+            )
         return self
 
     def ask_to_buy(self, player=None, number=0, price=0):
         """Ask to buy something from another player."""
         answer = player.reply_to_buy(self, number, price)
-        if answer:
-            self.pay(price, player)
-            self.properties.append(player.pop_property(number))
+        if answer and player.owns(number) and self.money > price:
+            self.pay(price, player, PROPERTY_SALE)
+            self.add_property(player.pop_property(number))
         return self
 
     def reply_to_buy(self, player=None, number=0, price=0):
         """Reply to another player's buy offer."""
-        # If player has little money accept the offer
-        if price > self.money:
-            return True
-        else:
-            r = np.random.rand()
-            return r > 0.5
+        return self.strategy.reply_to_buy(self, player, number, price)
 
     def ask_to_sell(self, player=None, number=0, price=0):
         """Ask to sell something to another player."""
         answer = player.reply_to_sell(self, number, price)
-        if answer:
-            player.pay(price, self)
-            player.properties.append(self.pop_property(number))
+        if answer and self.owns(number) and player.money > price:
+            player.pay(price, self, PROPERTY_SALE)
+            player.add_property(self.pop_property(number))
         return self
 
     def reply_to_sell(self, player=None, number=0, price=0):
         """Reply to another player's sell offer."""
-        # If the player does not have enough money reply no
-        if self.money < price:
-            return False
-        else:
-            r = np.random.rand()
-            return r > 0.5
+        return self.strategy.reply_to_sell(self, player, number, price)
 
     def guess_income_tax(self):
-        """Randomly guess if 10% or $200 income tax is better to pay"""
-        r = np.random.rand()
-        return 0.1 * self.networth if r > 0.5 else 200.0
+        """Guess if 10% or $200 income tax is better to pay"""
+        return self.strategy.guess_income_tax(self)
 
-    @staticmethod
-    def liquidate_or_auction():
+    def liquidate_or_auction(self):
         """Liquidate money or just put up for auction."""
-        r = np.random.rand()
-        return 0 if r > 0.5 else 1
+        return self.strategy.liquidate_or_auction(self)
 
     def go_to_space(self, number=0, pass_go=True, just_visiting=True):
         """Move player to specific space."""
         # Handle passing go
         if pass_go and self.position > number:
             self.round += 1
-            self.game.bank.pay(200.0, self)
-            logging.debug(
-                'Player %s passed go, bank paid $200. (M: $%s, D: $%s, NW: $%s)',
-                self.number, self.money, self.debt, self.networth
-            )
+            self.game.bank.pay(200.0, self, GO_SALARY)
+            if self.game.debug:
+                logging.debug(
+                    'Player %s passed go, bank paid $200. (M: $%s, D: $%s, NW: $%s)',
+                    self.number, self.money, self.debt, self.networth
+                )
         # Go to new position
         self.position = number
         # Set visiting flag
@@ -265,20 +376,62 @@ class Player(object):
         #     SPACE[self.position][0]
         # ])
 
-        jailvisit = ' (just visiting)' if number == JAIL and just_visiting else ''
-        logging.debug('Player %s goes to %s%s.', self.number, SPACE[self.position][0], jailvisit)
+        if self.game.debug:
+            jailvisit = ' (just visiting)' if number == JAIL and just_visiting else ''
+            logging.debug('Player %s goes to %s%s.', self.number, SPACE[self.position][0], jailvisit)
         self.handle_space()
         return self
 
     def go_to_nearest(self, space_list=None):
-        """Helper function to go to the nearest instance of a space."""
-        found = False
+        """Helper function to go to the nearest instance of a space, ahead of the player."""
         for p in space_list:
             if self.position < p:
-                found = True
-                self.go_to_space(p)
-        if not found:
-            self.go_to_space(space_list[0])
+                return self.go_to_space(p)
+        return self.go_to_space(space_list[0])
+
+    def card_advance(self, card=None):
+        """Advance to the card's space."""
+        return self.go_to_space(card.a)
+
+    def card_nearest(self, card=None):
+        """Advance to the nearest of the card's spaces."""
+        return self.go_to_nearest(NEAREST_SPACES[card.a])
+
+    def card_move(self, card=None):
+        """Move the card's number of spaces, never passing go."""
+        return self.go_to_space((self.position + card.a) % NUM_PROPERTIES, pass_go=False)
+
+    def card_collect(self, card=None):
+        """Collect the card's amount from the bank."""
+        return self.add(card.a, self.game.bank, CARD)
+
+    def card_pay(self, card=None):
+        """Pay the card's amount to free parking."""
+        return self.pay(card.a, self.game.freeparking, CARD)
+
+    def card_pay_each(self, card=None):
+        """Pay the card's amount to every other player."""
+        for plyr in self.game.others(self):
+            self.pay(card.a, plyr, CARD)
+        return self
+
+    def card_collect_each(self, card=None):
+        """Collect the card's amount from every other player."""
+        for plyr in self.game.others(self):
+            self.add(card.a, plyr, CARD)
+        return self
+
+    def card_repairs(self, card=None):
+        """Pay the card's amounts per house and per hotel to free parking."""
+        return self.pay(card.a * self.num_houses + card.b * self.num_hotels, self.game.freeparking, CARD)
+
+    def card_go_to_jail(self, card=None):
+        """Go to jail without passing go."""
+        return self.go_to_space(JAIL, pass_go=False, just_visiting=False)
+
+    def card_jail_free(self, card=None):
+        """Keep the card until it gets the player out of jail."""
+        self.cards.append(card)
         return self
 
     def liquidate(self, money=0.0):
@@ -305,55 +458,60 @@ class Player(object):
                         min_value = prop.value
                         candidate_prop = prop
             if candidate_prop:
-                candidate_prop.mortgaged = True
+                self.mortgage_property(candidate_prop)
                 procedes += candidate_prop.mortgage
-                self.add(candidate_prop.mortgage, self.game.bank)
-                logging.debug(
-                    'Player %s mortgaged %s for $%s. (M: $%s, D: $%s, NW: $%s)',
-                    self.number, candidate_prop.name, candidate_prop.mortgage, self.money, self.debt, self.networth
-                )
+                self.add(candidate_prop.mortgage, self.game.bank, MORTGAGE)
+                if self.game.debug:
+                    logging.debug(
+                        'Player %s mortgaged %s for $%s. (M: $%s, D: $%s, NW: $%s)',
+                        self.number, candidate_prop.name, candidate_prop.mortgage, self.money, self.debt, self.networth
+                    )
             else:
-                logging.debug(
-                    'Player %s has nothing to mortgage! (M: $%s, D: $%s, NW: $%s)',
-                    self.number, self.money, self.debt, self.networth
-                )
+                if self.game.debug:
+                    logging.debug(
+                        'Player %s has nothing to mortgage! (M: $%s, D: $%s, NW: $%s)',
+                        self.number, self.money, self.debt, self.networth
+                    )
                 break
 
         # Sell hotels
         if procedes < money:
             for prop in self.properties:
-                if prop.category == 'property':
+                if prop.kind == PROPERTY:
                     if prop.hotels > 0:
-                        prop.hotels -= 1
+                        self.sell_hotel(prop)
                         procedes += prop.cost
-                        self.add(prop.cost, self.game.bank)
-                        logging.debug(
-                            'Player %s sold %s hotel for %s. (M: $%s, D: $%s, NW: $%s)',
-                            self.number, prop.name, prop.cost, self.money, self.debt, self.networth
-                        )
+                        self.add(prop.cost, self.game.bank, BUILDING)
+                        if self.game.debug:
+                            logging.debug(
+                                'Player %s sold %s hotel for %s. (M: $%s, D: $%s, NW: $%s)',
+                                self.number, prop.name, prop.cost, self.money, self.debt, self.networth
+                            )
                         if procedes >= money:
                             break
 
         # Sell houses
         if procedes < money:
             for prop in self.properties:
-                if prop.category == 'property':
+                if prop.kind == PROPERTY:
                     if prop.houses > 0:
-                        prop.houses -= 1
+                        self.sell_house(prop)
                         procedes += prop.cost
-                        self.add(prop.cost, self.game.bank)
-                        logging.debug(
-                            'Player %s sold %s house for %s. (M: $%s, D: $%s, NW: $%s)',
-                            self.number, prop.name, prop.cost, self.money, self.debt, self.networth
-                        )
+                        self.add(prop.cost, self.game.bank, BUILDING)
+                        if self.game.debug:
+                            logging.debug(
+                                'Player %s sold %s house for %s. (M: $%s, D: $%s, NW: $%s)',
+                                self.number, prop.name, prop.cost, self.money, self.debt, self.networth
+                            )
                         if procedes >= money:
                             break
 
         if procedes < money:
-            logging.debug(
-                'Player %s with $%s networh was unable to liquidate $%s to pay $%s.',
-                self.number, self.networth, procedes, money
-            )
+            if self.game.debug:
+                logging.debug(
+                    'Player %s with $%s networh was unable to liquidate $%s to pay $%s.',
+                    self.number, self.networth, procedes, money
+                )
 
     def jail_time(self):
         """Make decision for what to do in jail."""
@@ -362,22 +520,25 @@ class Player(object):
         roll, doubles, dice = None, None, None
 
         # Use get out of jail free card, if player has one
-        if len(self.cards) > 0 and self.cards[0].name == 'Get out of Jail Free':
-            logging.debug('Player %s using "Get out of Jail Free" Card.', self.number)
+        if len(self.cards) > 0 and self.cards[0].op == JAIL_FREE:
+            if self.game.debug:
+                logging.debug('Player %s using "Get out of Jail Free" Card.', self.number)
             self.just_visiting = True
             self.jail_double_try = 0
             card = self.cards.pop(0)
             # replace card in deck
             if card.deck == 'Chance':
                 self.game.chance.append(card)
-                logging.debug('Player %s returned card to chance.', self.number)
+                if self.game.debug:
+                    logging.debug('Player %s returned card to chance.', self.number)
             elif card.deck == 'Chest':
                 self.game.community_chest.append(card)
-                logging.debug('Player %s returned card to community chest.', self.number)
+                if self.game.debug:
+                    logging.debug('Player %s returned card to community chest.', self.number)
             else:
                 logging.warning('Card is not chance or community chest.')
         # Either roll or pay
-        elif self.money > JAIL_COST:
+        elif self.money > self.game.jail_cost:
             # Pay or Roll decision unless, already tried doubles 3 times
             pay_or_roll = self.jail_pay_or_roll() if self.jail_double_try < 3 else 1
             # Try to roll doubles
@@ -386,40 +547,46 @@ class Player(object):
                 if doubles:
                     self.just_visiting = True
                     self.jail_double_try = 0
-                    logging.debug('Player %s rolled doubles to get out of jail.', self.number)
+                    if self.game.debug:
+                        logging.debug('Player %s rolled doubles to get out of jail.', self.number)
                 else:
                     self.jail_double_try += 1
-                    logging.debug('Player %s did NOT roll doubles. Still in jail.', self.number)
+                    if self.game.debug:
+                        logging.debug('Player %s did NOT roll doubles. Still in jail.', self.number)
             # Just pay to get out
             elif pay_or_roll == 1:
-                self.pay(JAIL_COST, self.game.freeparking)
+                self.pay(self.game.jail_cost, self.game.freeparking, JAIL_FEE)
                 self.just_visiting = True
                 self.jail_double_try = 0
-                logging.debug(
-                    'Player %s paid %s to get out of jail. (M: $%s, D: $%s, NW: $%s)',
-                    self.number, JAIL_COST, self.money, self.debt, self.networth
-                )
+                if self.game.debug:
+                    logging.debug(
+                        'Player %s paid %s to get out of jail. (M: $%s, D: $%s, NW: $%s)',
+                        self.number, self.game.jail_cost, self.money, self.debt, self.networth
+                    )
             else:
                 logging.warning('Pay or Roll decision not possible.')
         else:
-            logging.debug(
-                'Player %s does not have enough money, liquidate some assets to get Jail fee. (M: $%s, D: $%s, NW: $%s)',
-                self.number, self.money, self.debt, self.networth
-            )
-            self.liquidate(JAIL_COST)
-            if self.money > JAIL_COST:
-                self.pay(JAIL_COST, self.game.freeparking)
-                self.just_visiting = True
-                self.jail_double_try = 0
+            if self.game.debug:
                 logging.debug(
-                    'Player %s paid %s to get out of jail. (M: $%s, D: $%s, NW: $%s)',
-                    self.number, JAIL_COST, self.money, self.debt, self.networth
-                )
-            else:
-                logging.debug(
-                    'Player %s could not find enough money. Still in jail. (M: $%s, D: $%s, NW: $%s)',
+                    'Player %s does not have enough money, liquidate some assets to get Jail fee. (M: $%s, D: $%s, NW: $%s)',
                     self.number, self.money, self.debt, self.networth
                 )
+            self.liquidate(self.game.jail_cost)
+            if self.money > self.game.jail_cost:
+                self.pay(self.game.jail_cost, self.game.freeparking, JAIL_FEE)
+                self.just_visiting = True
+                self.jail_double_try = 0
+                if self.game.debug:
+                    logging.debug(
+                        'Player %s paid %s to get out of jail. (M: $%s, D: $%s, NW: $%s)',
+                        self.number, self.game.jail_cost, self.money, self.debt, self.networth
+                    )
+            else:
+                if self.game.debug:
+                    logging.debug(
+                        'Player %s could not find enough money. Still in jail. (M: $%s, D: $%s, NW: $%s)',
+                        self.number, self.money, self.debt, self.networth
+                    )
         return (roll, doubles, dice)
 
     def take_turn(self):
@@ -445,15 +612,17 @@ class Player(object):
             # TODO: Code turn actions in between double rolls
             while doubles and doubles_count < MAX_DOUBLES:
                 doubles_count += 1
-                logging.debug(
-                    'Player %s rolls %s = %s. Double count = %s. (M: $%s, D: $%s, NW: $%s)',
-                    self.number, dice, roll, doubles_count, self.money, self.debt, self.networth
+                if self.game.debug:
+                    logging.debug(
+                        'Player %s rolls %s = %s. Double count = %s. (M: $%s, D: $%s, NW: $%s)',
+                        self.number, dice, roll, doubles_count, self.money, self.debt, self.networth
                 )
                 roll, doubles, dice = self.roll_dice()
 
-            logging.debug(
-                'Player %s rolls %s = %s. Double count = %s. (M: $%s, D: $%s, NW: $%s)',
-                self.number, dice, roll, doubles_count, self.money, self.debt, self.networth
+            if self.game.debug:
+                logging.debug(
+                    'Player %s rolls %s = %s. Double count = %s. (M: $%s, D: $%s, NW: $%s)',
+                    self.number, dice, roll, doubles_count, self.money, self.debt, self.networth
                 )
 
             # self.game.record.append([
@@ -470,16 +639,18 @@ class Player(object):
             # Go to rolled property or jail
             if doubles_count >= 3:
                 self.go_to_space(JAIL, pass_go=False, just_visiting=False)
-                logging.debug('Player %s rolled doubles 3 times, going to jail.', self.number)
+                if self.game.debug:
+                    logging.debug('Player %s rolled doubles 3 times, going to jail.', self.number)
             else:
                 self.go_to_space((self.position + roll) % NUM_PROPERTIES)
 
         # Check for bankruptcy at end of turn
         if self.bankrupt:
-            logging.debug(
-                'Player %s is bankrupt - why did this happen here. (M: $%s, D: $%s, NW: $%s)',
-                self.number, self.money, self.debt, self.networth
-            )
+            if self.game.debug:
+                logging.debug(
+                    'Player %s is bankrupt - why did this happen here. (M: $%s, D: $%s, NW: $%s)',
+                    self.number, self.money, self.debt, self.networth
+                )
         return self
 
     def handle_space(self):
@@ -487,56 +658,63 @@ class Player(object):
 
         # Landing on Go, collect money
         if self.position == GO:
-            self.game.bank.pay(200.0, self)
-            logging.debug(
-                'Player %s landed on Go and collects another $200! (M: $%s, D: $%s, NW: $%s)',
-                self.number, self.money, self.debt, self.networth
-            )
+            self.game.bank.pay(200.0, self, GO_SALARY)
+            if self.game.debug:
+                logging.debug(
+                    'Player %s landed on Go and collects another $200! (M: $%s, D: $%s, NW: $%s)',
+                    self.number, self.money, self.debt, self.networth
+                )
 
         # Landing on Jail, just hang out until next turn
         elif self.position == JAIL:
-            visiting = 'visiting' if self.just_visiting else 'in'
-            logging.debug('Player %s is %s jail. Hang until next turn.', self.number, visiting)
+            if self.game.debug:
+                visiting = 'visiting' if self.just_visiting else 'in'
+                logging.debug('Player %s is %s jail. Hang until next turn.', self.number, visiting)
 
         # Landing on Go to Jail, go to jail without passing Go
         elif self.position == GO_TO_JAIL:
             self.go_to_space(JAIL, pass_go=False, just_visiting=False)
-            logging.debug('Player %s goes to jail.', self.number)
+            if self.game.debug:
+                logging.debug('Player %s goes to jail.', self.number)
 
         # Landing on Luxury or Income Tax, pay indicated amount
         elif self.position == LUXURY_TAX or self.position == INCOME_TAX:
             tax = 75.0 if self.position == LUXURY_TAX else self.guess_income_tax()
-            self.pay(tax, self.game.freeparking)
-            logging.debug(
-                'Player %s pays $%s tax. (M: $%s, D: $%s, NW: $%s)',
-                self.number, tax, self.money, self.debt, self.networth
-            )
+            self.pay(tax, self.game.freeparking, TAX)
+            if self.game.debug:
+                logging.debug(
+                    'Player %s pays $%s tax. (M: $%s, D: $%s, NW: $%s)',
+                    self.number, tax, self.money, self.debt, self.networth
+                )
 
         # Landing on Free Parking, Collect the money
         elif self.position == FREE_PARKING:
             kitty = self.game.freeparking.money
-            self.add(kitty, self.game.freeparking)
-            logging.debug(
-                'Player %s collects $%s from free parking. (M: $%s, D: $%s, NW: $%s)',
-                self.number, kitty, self.money, self.debt, self.networth
-            )
+            self.add(kitty, self.game.freeparking, KITTY)
+            if self.game.debug:
+                logging.debug(
+                    'Player %s collects $%s from free parking. (M: $%s, D: $%s, NW: $%s)',
+                    self.number, kitty, self.money, self.debt, self.networth
+                )
 
         # Landing on Chance, follow card instructions
         elif self.position in CHANCE:
             card = self.game.draw_chance()
-            logging.debug(
-                'Player %s draws "%s" from chance. (M: $%s, D: $%s, NW: $%s)',
-                self.number, card.name, self.money, self.debt, self.networth
-            )
+            if self.game.debug:
+                logging.debug(
+                    'Player %s draws "%s" from chance. (M: $%s, D: $%s, NW: $%s)',
+                    self.number, card.name, self.money, self.debt, self.networth
+                )
             self.follow(card)
 
         # Landing on Community Chest, follow card instructions
         elif self.position in COMMUNITY_CHEST:
             card = self.game.draw_community_chest()
-            logging.debug(
-                'Player %s draws "%s" from community chest. (M: $%s, D: $%s, NW: $%s)',
-                self.number, card.name, self.money, self.debt, self.networth
-            )
+            if self.game.debug:
+                logging.debug(
+                    'Player %s draws "%s" from community chest. (M: $%s, D: $%s, NW: $%s)',
+                    self.number, card.name, self.money, self.debt, self.networth
+                )
             self.follow(card)
 
         # Land on Property space, Buy Rent or hold
@@ -548,71 +726,67 @@ class Player(object):
     def handle_property(self):
         """Determine what to do with a property. Buy, rent or nothing."""
 
+        plyr = self.game.owners[self.position]
         # If self owns this do nothing
-        if self.owns(self.position):
-            prop = self.get_property(self.position)
-            logging.debug('Player %s already owns %s. Do Nothing.', self.number, prop.name)
-            return self
+        if plyr is self:
+            prop = self.game.deeds[self.position]
+            if self.game.debug:
+                logging.debug('Player %s already owns %s. Do Nothing.', self.number, prop.name)
+        # If another player owns it pay rent
+        elif plyr is not None:
+            prop = self.game.deeds[self.position]
+            # Property Mortgaged, do nothing
+            if prop.mortgaged:
+                if self.game.debug:
+                    logging.debug('%s is mortgaged. Do Nothing.', prop.name)
+            # Pay Rent
+            else:
+                rent = prop.rent(plyr)
+                self.pay(rent, plyr, RENT)
+                if self.game.debug:
+                    logging.debug(
+                        'Player %s pays $%s rent to Player %s for %s. (M: $%s, D: $%s, NW: $%s)',
+                        self.number, rent, plyr.number, prop.name, self.money, self.debt, self.networth
+                    )
+        # Try to Buy if nobody owns
+        elif self.money > PROPERTY_PRICES[self.position]:
+            self.buy_property()
         else:
-            owned = False
-            # Check to see if other players own property to pay rent
-            for plyr in self.game.others(self):
-                if plyr.owns(self.position):
-                    owned = True
-                    prop = plyr.get_property(self.position)
-                    # Property Mortgaged, do nothing
-                    if prop.mortgaged:
-                        logging.debug('%s is mortgaged. Do Nothing.', prop.name)
-                        return self
-                    # Pay Rent
-                    else:
-                        rent = prop.rent(plyr)
-                        self.pay(rent, plyr)
-                        logging.debug(
-                            'Player %s pays $%s rent to Player %s for %s. (M: $%s, D: $%s, NW: $%s)',
-                            self.number, rent, plyr.number, prop.name, self.money, self.debt, self.networth
-                        )
-            # Try to Buy if nobody owns
-            if not owned:
+            if self.game.debug:
+                logging.debug(
+                    'Player %s cannot afford %s for $%s. (M: $%s, D: $%s, NW: $%s)',
+                    self.number,
+                    PROPERTY_NAMES[self.position],
+                    PROPERTY_PRICES[self.position],
+                    self.money, self.debt, self.networth
+                )
+            find_money_or_auction = self.liquidate_or_auction()
+            # Look for money to buy property
+            if find_money_or_auction is 0:
+                self.liquidate(PROPERTY_PRICES[self.position])
+                if self.game.debug:
+                    logging.debug(
+                        'Player %s decided to try liquidate some money. (M: $%s, D: $%s, NW: $%s)',
+                        self.number, self.money, self.debt, self.networth
+                    )
                 if self.money > PROPERTY_PRICES[self.position]:
                     self.buy_property()
-                else:
+            # Auction the property for bid
+            elif find_money_or_auction is 1:
+                if self.game.debug:
                     logging.debug(
-                        'Player %s cannot afford %s for $%s. (M: $%s, D: $%s, NW: $%s)',
-                        self.number,
-                        PROPERTY_NAMES[self.position],
-                        PROPERTY_PRICES[self.position],
-                        self.money, self.debt, self.networth
+                        'Player %s decided to auction off %s. (M: $%s, D: $%s, NW: $%s)',
+                        self.number, PROPERTY_NAMES[self.position], self.money, self.debt, self.networth
                     )
-                    find_money_or_auction = self.liquidate_or_auction()
-                    # Look for money to buy property
-                    if find_money_or_auction is 0:
-                        self.liquidate(PROPERTY_PRICES[self.position])
-                        logging.debug(
-                            'Player %s decided to try liquidate some money. (M: $%s, D: $%s, NW: $%s)',
-                            self.number, self.money, self.debt, self.networth
-                        )
-                        if self.money > PROPERTY_PRICES[self.position]:
-                            self.buy_property()
-                    # Auction the property for bid
-                    elif find_money_or_auction is 1:
-                        logging.debug(
-                            'Player %s decided to auction off %s. (M: $%s, D: $%s, NW: $%s)',
-                            self.number, PROPERTY_NAMES[self.position], self.money, self.debt, self.networth
-                        )
-                        self.game.new_property_auction(self.position)
+                self.game.new_property_auction(self.position)
 
         return self
 
     def check_monopolies(self):
-        """Look for ownership of all groups in player's properties"""
-        monopolies = set()
-        for prop in self.properties:
-            if prop.category == 'property':
-                same_color = sum([prop.color == otherprop.color and not otherprop.mortgaged for otherprop in self.properties])
-                if same_color == COLOR_COUNTS[prop.color]:
-                    monopolies.add(prop.color)
-        return monopolies
+        """Look for ownership of all groups in player's properties, in board order"""
+        if not self.monopolies:
+            return []
+        return [color for i, color in enumerate(COLORS) if self.monopolies & (1 << i)]
 
     def develop(self):
         """Look for opportunities to develop properties."""
@@ -630,27 +804,47 @@ class Player(object):
             monopoly_levels = [prop.level for prop in monopoly_props]
             dev_level = min(monopoly_levels)
             if dev_level < MAX_LEVEL:
-                logging.debug(
-                    'Player %s has a monopoly on %s %s with development at %s. (M: $%s, D: $%s, NW: $%s)',
-                    self.number, monopoly, monopoly_props, dev_level,
-                    self.money, self.debt, self.networth
-                )
+                if self.game.debug:
+                    logging.debug(
+                        'Player %s has a monopoly on %s %s with development at %s. (M: $%s, D: $%s, NW: $%s)',
+                        self.number, monopoly, monopoly_props, dev_level,
+                        self.money, self.debt, self.networth
+                    )
                 # Loop thru properties to develop only the ones at the currect minimum development level
                 # TODO: allow multiple development cycles.
                 for prop in monopoly_props:
-                    if prop.level == dev_level and prop.cost < self.risk_tolerance * self.money:
-                        self.pay(prop.cost, self.game.bank)
+                    # Never build past the cash in hand, as buy_property, a risk tolerance above 1 builds as 1
+                    if prop.level == dev_level and prop.cost < self.money and prop.cost < self.risk_tolerance * self.money:
+                        self.pay(prop.cost, self.game.bank, BUILDING)
+                        # A bankrupt player's deeds are back with the bank
+                        if self.bankrupt:
+                            return self
                         if prop.houses < MAX_HOUSE_LEVEL:
-                            prop.houses += 1
-                            logging.debug(
-                                'Player %s building house for %s on %s. (M: $%s, D: $%s, NW: $%s)',
-                                self.number, prop.cost, prop.name, self.money, self.debt, self.networth
-                            )
+                            self.build_house(prop)
+                            if self.game.debug:
+                                logging.debug(
+                                    'Player %s building house for %s on %s. (M: $%s, D: $%s, NW: $%s)',
+                                    self.number, prop.cost, prop.name, self.money, self.debt, self.networth
+                                )
                         elif prop.hotels < 1:
-                            prop.hotels += 1
-                            logging.debug(
-                                'Player %s building hotel for %s on %s. (M: $%s, D: $%s, NW: $%s)',
-                                self.number, prop.cost, prop.name, self.money, self.debt, self.networth
-                            )
+                            self.build_hotel(prop)
+                            if self.game.debug:
+                                logging.debug(
+                                    'Player %s building hotel for %s on %s. (M: $%s, D: $%s, NW: $%s)',
+                                    self.number, prop.cost, prop.name, self.money, self.debt, self.networth
+                                )
 
         return self
+
+# Card rules by op code
+CARD_RULES = [None] * (JAIL_FREE + 1)
+CARD_RULES[ADVANCE] = Player.card_advance
+CARD_RULES[NEAREST] = Player.card_nearest
+CARD_RULES[MOVE] = Player.card_move
+CARD_RULES[COLLECT] = Player.card_collect
+CARD_RULES[PAY] = Player.card_pay
+CARD_RULES[PAY_EACH] = Player.card_pay_each
+CARD_RULES[COLLECT_EACH] = Player.card_collect_each
+CARD_RULES[REPAIRS] = Player.card_repairs
+CARD_RULES[GO_JAIL] = Player.card_go_to_jail
+CARD_RULES[JAIL_FREE] = Player.card_jail_free
@@ -2,7 +2,8 @@
 Player.py - File for defining a Property class.
 """
 
-from monopoly.Constants import CARD_WIDTH, MAX_LEVEL, UTILITIES, RAILROADS, COLOR_COUNTS
+from monopoly.Constants import CARD_WIDTH, MAX_LEVEL, COLOR_INDEX
+from monopoly.Board import CATEGORY, CATEGORY_NAMES, PROPERTY, RAILROAD, UTILITY
 
 class Property(object):
     """Defines a property."""
@@ -11,7 +12,9 @@ class Property(object):
         """Initialize a property."""
         self.name = name
         self.color = color
+        self.group = COLOR_INDEX.get(color)
         self.loc = loc
+        self.kind = int(CATEGORY[loc])
         self.price = price
         self.rents = rents
         self.mortgage = mortgage
@@ -20,6 +23,13 @@ class Property(object):
         self.houses = 0
         self.hotels = 0
 
+    def reset(self):
+        """Clear development and mortgage for a new game."""
+        self.mortgaged = False
+        self.houses = 0
+        self.hotels = 0
+        return self
+
     @property
     def level(self):
         """Determine the development level of the property."""
@@ -28,7 +38,7 @@ class Property(object):
     @property
     def value(self):
         """Calculate the instantaneous value of a property."""
-        if self.category == 'property':
+        if self.kind == PROPERTY:
             return self.mortgage + self.cost * (self.houses + self.hotels)
         else:
             return self.mortgage
@@ -36,16 +46,7 @@ class Property(object):
     @property
     def category(self):
         """Determine the category type of the card."""
-        if self.name in {'Go', 'Jail', 'Go To Jail', 'Free Parking', 'Income Tax', 'Luxury Tax'}:
-            return 'other'
-        elif self.name in {'Community Chest', 'Chance'}:
-            return 'card'
-        elif self.color == 'Railroad':
-            return 'railroad'
-        elif self.color == 'Utility':
-            return 'utility'
-        else:
-            return 'property'
+        return CATEGORY_NAMES[self.kind]
 
     def __str__(self):
         """String print out of card."""
@@ -113,17 +114,17 @@ class Property(object):
         if player is None:
             return self.rents[0]
         else:
-            same_color = sum([self.color == prop.color and not prop.mortgaged for prop in player.properties])
+            same_color = player.color_counts[self.group]
             rent = 0
             # Rent x times dice roll
-            if self.loc in UTILITIES:
+            if self.kind == UTILITY:
                 roll, _, _ = player.roll_dice()
                 rent = roll * self.rents[same_color - 1]
             # Rent times number owned
-            elif self.loc in RAILROADS:
+            elif self.kind == RAILROAD:
                 rent = self.rents[same_color - 1]
             # Rent if all owned
-            elif same_color == COLOR_COUNTS[self.color]:
+            elif player.monopolies & (1 << self.group):
                 # Rent doubled if no houses or hotels
                 if self.houses == 0 and self.hotels == 0:
                     rent = 2.0 * self.rents[0]
@@ -0,0 +1,217 @@
+"""
+Record.py - File for defining a Record class and the sinks that stream records to disk.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Per turn record columns and their types
+RECORD_COLUMNS = [
+    'game', 'round', 'bank', 'freeparking', 'total', 'open_properties', 'player', 'money', 'properties', 'networth',
+    'num_houses', 'num_hotels', 'cards'
+]
+RECORD_DTYPES = {
+    'game' : np.int64,
+    'round' : np.int64,
+    'bank' : np.float64,
+    'freeparking' : np.float64,
+    'total' : np.float64,
+    'open_properties' : np.int64,
+    'player' : np.int64,
+    'money' : np.float64,
+    'properties' : np.int64,
+    'networth' : np.float64,
+    'num_houses' : np.int64,
+    'num_hotels' : np.int64,
+    'cards' : np.int64
+}
+
+# Rows buffered before a chunk is written to a sink
+CHUNK_ROWS = 65536
+MANIFEST = 'manifest.json'
+
+class Record(object):
+    """Defines a growable columnar buffer of game data, one array per column."""
+
+    def __init__(self, columns=None, dtypes=None, capacity=1024, sink=None):
+        """Initialize a record buffer. With a sink, a full buffer is written to the sink instead of growing."""
+        self.columns = columns if columns else RECORD_COLUMNS
+        self.dtypes = dtypes if dtypes else RECORD_DTYPES
+        self.capacity = capacity
+        self.sink = sink
+        self.size = 0
+        self.data = [np.empty(capacity, dtype=self.dtypes[col]) for col in self.columns]
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return 'Record ({} rows)'.format(self.size)
+
+    def grow(self):
+        """Double the capacity of the buffer."""
+        self.capacity *= 2
+        for i, array in enumerate(self.data):
+            grown = np.empty(self.capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            self.data[i] = grown
+        return self
+
+    def append(self, *row):
+        """Append one row of values, given in column order."""
+        if self.size == self.capacity:
+            if self.sink is not None:
+                self.flush()
+            else:
+                self.grow()
+        for array, value in zip(self.data, row):
+            array[self.size] = value
+        self.size += 1
+        return self
+
+    def clear(self):
+        """Empty the buffer, keeping its capacity."""
+        self.size = 0
+        return self
+
+    def flush(self):
+        """Write the buffered rows to the sink and empty the buffer."""
+        if self.size:
+            self.sink.write(self)
+        return self.clear()
+
+    @classmethod
+    def from_frame(cls, frame=None):
+        """Make a record buffer holding the rows of a DataFrame of numeric columns."""
+        columns = list(frame.columns)
+        record = cls(columns, {col: frame[col].dtype for col in columns}, capacity=0)
+        record.data = [frame[col].values for col in columns]
+        record.capacity = record.size = len(frame)
+        return record
+
+    def to_frame(self):
+        """Convert the buffered rows to a DataFrame."""
+        frame = pd.DataFrame({col: array[:self.size] for col, array in zip(self.columns, self.data)}, columns=self.columns)
+        frame.index.name = 'turn'
+        return frame
+
+class CsvSink(object):
+    """Defines a CSV file that records are appended to."""
+
+    extension = '.csv'
+
+    def __init__(self, path='', columns=None, dtypes=None):
+        """Initialize a CSV sink, writing the header to a new file."""
+        self.path = path
+        self.columns = columns if columns else RECORD_COLUMNS
+        self.dtypes = dtypes if dtypes else RECORD_DTYPES
+        self.rows = 0
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, 'w') as f:
+                f.write(','.join(self.columns) + '\n')
+
+    def __repr__(self):
+        return 'CsvSink ({})'.format(self.path)
+
+    def write(self, record=None):
+        """Append the rows of a record buffer."""
+        record.to_frame().to_csv(self.path, mode='a', header=False, index=False)
+        self.rows += len(record)
+        return self
+
+    @staticmethod
+    def read(path=''):
+        """Read a CSV part. Return a DataFrame."""
+        return pd.read_csv(path, dtype=RECORD_DTYPES, float_precision='round_trip')
+
+class BinarySink(object):
+    """Defines a directory of raw column files that records are appended to, one <column>.bin per column."""
+
+    extension = ''
+
+    def __init__(self, path='', columns=None, dtypes=None):
+        """Initialize a binary sink, continuing the directory's rows if it exists."""
+        self.path = path
+        self.columns = columns if columns else RECORD_COLUMNS
+        self.dtypes = dtypes if dtypes else RECORD_DTYPES
+        self.rows = 0
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        elif os.path.exists(os.path.join(path, 'meta.json')):
+            with open(os.path.join(path, 'meta.json')) as f:
+                self.rows = json.load(f)['rows']
+
+    def __repr__(self):
+        return 'BinarySink ({})'.format(self.path)
+
+    @property
+    def meta(self):
+        """Describe the column files."""
+        return {
+            'columns' : self.columns,
+            'dtypes' : {col: np.dtype(self.dtypes[col]).str for col in self.columns},
+            'rows' : self.rows
+        }
+
+    def write(self, record=None):
+        """Append the rows of a record buffer, then update meta.json."""
+        for col, array in zip(record.columns, record.data):
+            with open(os.path.join(self.path, '{}.bin'.format(col)), 'ab') as f:
+                array[:record.size].tofile(f)
+        self.rows += len(record)
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump(self.meta, f, indent=4)
+        return self
+
+    @staticmethod
+    def read(path=''):
+        """Read a binary part. Return a DataFrame."""
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        data = {col: np.fromfile(os.path.join(path, '{}.bin'.format(col)), dtype=meta['dtypes'][col]) for col in meta['columns']}
+        return pd.DataFrame(data, columns=meta['columns'])
+
+# Sink classes by format name
+SINKS = {
+    'csv' : CsvSink,
+    'binary' : BinarySink
+}
+
+def open_sink(record_dir='', record_format='binary', name=''):
+    """Open the sink of part name in record_dir, one part per worker process."""
+    if record_format not in SINKS:
+        raise ValueError('Unknown record format {}, use one of {}.'.format(record_format, sorted(SINKS)))
+    sink = SINKS[record_format]
+    return sink(os.path.join(record_dir, 'part-{}{}'.format(name, sink.extension)))
+
+def write_frame(path='', frame=None):
+    """Write a DataFrame of numeric columns as a binary part. Return the sink."""
+    columns = list(frame.columns)
+    return BinarySink(path, columns, {col: frame[col].dtype for col in columns}).write(Record.from_frame(frame))
+
+def write_manifest(record_dir='', record_format='binary', **info):
+    """List the parts in record_dir and describe the run in its manifest. Return the manifest."""
+    manifest = {
+        'format' : record_format,
+        'columns' : RECORD_COLUMNS,
+        'dtypes' : {col: np.dtype(RECORD_DTYPES[col]).str for col in RECORD_COLUMNS},
+        'parts' : sorted(part for part in os.listdir(record_dir) if part.startswith('part-'))
+    }
+    manifest.update(info)
+    with open(os.path.join(record_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    return manifest
+
+def read_records(record_dir=''):
+    """Combine the parts listed in a record directory's manifest. Return a DataFrame ordered by game."""
+    with open(os.path.join(record_dir, MANIFEST)) as f:
+        manifest = json.load(f)
+    read = SINKS[manifest['format']].read
+    parts = [read(os.path.join(record_dir, part)) for part in manifest['parts']]
+    if not parts:
+        return pd.DataFrame(columns=manifest['columns'])
+    # Each game's rows are contiguous in one part, a stable sort keeps them in turn order
+    records = pd.concat(parts, ignore_index=True)
+    return records.sort_values('game', kind='mergesort').reset_index(drop=True)
@@ -0,0 +1,126 @@
+"""
+Results.py - File for defining a ResultsStore class.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from monopoly.Record import MANIFEST
+
+# Rows read from the column files at once
+QUERY_ROWS = 1 << 20
+
+def accumulate(total=None, values=None, weights=None):
+    """Add the bincount of values (optionally weighted) to a running total. Return the total."""
+    counts = np.bincount(values, weights=weights)
+    if len(counts) > len(total):
+        total = np.concatenate([total, np.zeros(len(counts) - len(total), dtype=total.dtype)])
+    total[:len(counts)] += counts
+    return total
+
+class ResultsStore(object):
+    """
+    Defines a read only view of a binary record directory written by run_games(record_dir=...). Column files
+    are memory mapped and queries run over them chunk by chunk, so results far larger than memory can be
+    aggregated without loading them.
+    """
+
+    def __init__(self, record_dir='', chunk_rows=QUERY_ROWS):
+        """Open a record directory."""
+        self.record_dir = record_dir
+        self.chunk_rows = chunk_rows
+        with open(os.path.join(record_dir, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        if self.manifest['format'] != 'binary':
+            raise ValueError('Only binary records can be memory mapped, {} holds {} records.'.format(record_dir, self.manifest['format']))
+        self.num_players = self.manifest['num_players']
+        self.parts = [self.open_part(os.path.join(record_dir, part)) for part in self.manifest['parts']]
+        self.games = self.open_part(os.path.join(record_dir, self.manifest['games']))
+
+    def __len__(self):
+        return sum(rows for rows, _ in self.parts)
+
+    def __repr__(self):
+        return 'ResultsStore ({} games, {} rows)'.format(self.games[0], len(self))
+
+    @staticmethod
+    def open_part(path=''):
+        """Memory map the column files of a part. Return (rows, {column: memmap})."""
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        columns = {}
+        if meta['rows']:
+            for col in meta['columns']:
+                columns[col] = np.memmap(os.path.join(path, '{}.bin'.format(col)), dtype=meta['dtypes'][col], mode='r', shape=(meta['rows'],))
+        return meta['rows'], columns
+
+    def chunks(self, columns=None, table='records'):
+        """Iterate over chunks of the records (or games) table, as dicts of column arrays."""
+        parts = self.parts if table == 'records' else [self.games]
+        for rows, data in parts:
+            for start in xrange(0, rows, self.chunk_rows):
+                yield {col: np.asarray(data[col][start:start + self.chunk_rows]) for col in columns}
+
+    def win_rate(self):
+        """Return the fraction of games won by each seat."""
+        wins = np.zeros(self.num_players)
+        for chunk in self.chunks(['winner'], 'games'):
+            wins = accumulate(wins, chunk['winner'])
+        rate = pd.Series(wins / max(wins.sum(), 1.0), name='win_rate')
+        rate.index.name = 'player'
+        return rate
+
+    def games_by_round(self):
+        """Return the number of games still being played in each round."""
+        ended = np.zeros(1)
+        for chunk in self.chunks(['rounds'], 'games'):
+            ended = accumulate(ended, chunk['rounds'])
+        # Games with rounds >= r were played in round r
+        return ended[::-1].cumsum()[::-1]
+
+    def networth_by_round(self):
+        """Return the mean networth of each seat after its turn in every round, while still playing."""
+        totals, counts = np.zeros(0), np.zeros(0)
+        for chunk in self.chunks(['round', 'player', 'networth']):
+            key = chunk['round'] * self.num_players + chunk['player']
+            totals = accumulate(totals, key, chunk['networth'])
+            counts = accumulate(counts, key)
+        # One row per round, one column per seat
+        size = -(-len(totals) // self.num_players) * self.num_players
+        totals = np.append(totals, np.zeros(size - len(totals))).reshape(-1, self.num_players)
+        counts = np.append(counts, np.zeros(size - len(counts))).reshape(-1, self.num_players)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            networth = pd.DataFrame(totals / counts).iloc[1:]
+        networth.index.name = 'round'
+        networth.columns.name = 'player'
+        return networth
+
+    def bankruptcy_rounds(self):
+        """Return the number of bankruptcies in each round."""
+        bankruptcies = np.zeros(1)
+        columns = ['bankrupt_{}'.format(seat) for seat in xrange(self.num_players)]
+        for chunk in self.chunks(columns, 'games'):
+            for col in columns:
+                rounds = chunk[col]
+                bankruptcies = accumulate(bankruptcies, rounds[rounds > 0])
+        bankruptcies = pd.Series(bankruptcies[1:], index=np.arange(1, len(bankruptcies)), name='bankruptcies')
+        bankruptcies.index.name = 'round'
+        return bankruptcies
+
+    def buildings_by_round(self):
+        """Return the mean houses and hotels on the board per game in every round."""
+        houses, hotels = np.zeros(0), np.zeros(0)
+        for chunk in self.chunks(['round', 'num_houses', 'num_hotels']):
+            houses = accumulate(houses, chunk['round'], chunk['num_houses'])
+            hotels = accumulate(hotels, chunk['round'], chunk['num_hotels'])
+        games = self.games_by_round()
+        rounds = min(len(houses), len(games))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            buildings = pd.DataFrame({
+                'houses' : houses[:rounds] / games[:rounds],
+                'hotels' : hotels[:rounds] / games[:rounds]
+            }, columns=['houses', 'hotels']).iloc[1:]
+        buildings.index.name = 'round'
+        return buildings
@@ -0,0 +1,124 @@
+"""
+Strategy.py - File for defining a Strategy class.
+"""
+
+import numpy as np
+
+from monopoly.Constants import NUM_PROPERTIES
+
+# Chance of each coin flip decision, as the original Player
+COIN_FLIP = 0.5
+
+def space_table(value=0.0):
+    """Broadcast a scalar or per space sequence to a table of NUM_PROPERTIES floats."""
+    return np.ones(NUM_PROPERTIES) * np.asarray(value, dtype=np.float64)
+
+class Strategy(object):
+    """
+    Defines the decisions of a Player. Every decision is a coin flip and auction bids are drawn around the
+    property price. Auction bids are always decided from the bid_mean and bid_spread tables, multiples of the
+    price per space, so a Game can draw all bids at once. Strategies only hold data, so they pickle to worker
+    processes and one instance can be shared by many seats and games.
+    """
+
+    def __init__(self, name='coinflip', risk_mean=0.75, risk_std=0.1):
+        """Initialize a strategy. Risk tolerances are drawn from a normal distribution of risk_mean and risk_std."""
+        self.name = name
+        self.risk_mean = risk_mean
+        self.risk_std = risk_std
+        self.bid_mean = space_table(1.0)
+        self.bid_spread = space_table(0.5)
+
+    def __repr__(self):
+        return 'Strategy {}'.format(self.name)
+
+    def risk_tolerance(self, player=None):
+        """Draw the fraction of its money a player is willing to spend on one building."""
+        return player.game.random.normal(self.risk_mean, self.risk_std)
+
+    def jail_pay_or_roll(self, player=None): # pylint:disable=no-self-use
+        """Pay (1) or roll (0) to get out of jail."""
+        r = player.game.random.uniform()
+        return 0 if r > COIN_FLIP else 1
+
+    def reply_to_buy(self, player=None, buyer=None, number=0, price=0): # pylint:disable=no-self-use,unused-argument
+        """Reply to a buyer's offer for a property."""
+        # If player has little money accept the offer
+        if price > player.money:
+            return True
+        r = player.game.random.uniform()
+        return r > COIN_FLIP
+
+    def reply_to_sell(self, player=None, seller=None, number=0, price=0): # pylint:disable=no-self-use,unused-argument
+        """Reply to a seller's offer of a property."""
+        # If the player does not have enough money reply no
+        if player.money < price:
+            return False
+        r = player.game.random.uniform()
+        return r > COIN_FLIP
+
+    def guess_income_tax(self, player=None): # pylint:disable=no-self-use
+        """Randomly guess if 10% or $200 income tax is better to pay."""
+        r = player.game.random.uniform()
+        return 0.1 * player.networth if r > COIN_FLIP else 200.0
+
+    def liquidate_or_auction(self, player=None): # pylint:disable=no-self-use
+        """Liquidate (0) to buy the property the player cannot afford, or auction it (1)."""
+        r = player.game.random.uniform()
+        return 0 if r > COIN_FLIP else 1
+
+class TableStrategy(Strategy):
+    """
+    Defines a Strategy deciding from precomputed tables instead of coin flips. Scalars apply to every space.
+
+    risk: fixed risk tolerance
+    jail_pay: chance of paying out of jail after 0, 1 and 2 failed doubles tries
+    bid: auction valuation (mean, standard deviation), as multiples of the price
+    sell_at: lowest price accepted for a property, as a multiple of its price
+    buy_at: highest price paid for a property, as a multiple of its price
+    liquidate: chance of liquidating to buy a property rather than auctioning it
+    """
+
+    def __init__(self, name='table', risk=0.75, jail_pay=COIN_FLIP, bid=(1.0, 0.5), sell_at=1.0, buy_at=1.0, liquidate=COIN_FLIP):
+        """Initialize a table strategy."""
+        super(TableStrategy, self).__init__(name)
+        self.risk = risk
+        self.jail_pay = np.ones(3) * np.asarray(jail_pay, dtype=np.float64)
+        self.bid_mean = space_table(bid[0])
+        self.bid_spread = space_table(bid[1])
+        self.sell_at = space_table(sell_at)
+        self.buy_at = space_table(buy_at)
+        self.liquidate = space_table(liquidate)
+
+    def risk_tolerance(self, player=None):
+        """Use the fixed risk tolerance."""
+        return self.risk
+
+    def jail_pay_or_roll(self, player=None):
+        """Pay (1) or roll (0) with the chance of paying after the failed tries."""
+        r = player.game.random.uniform()
+        return 1 if r < self.jail_pay[min(player.jail_double_try, 2)] else 0
+
+    def reply_to_buy(self, player=None, buyer=None, number=0, price=0):
+        """Sell at or above the sell_at price."""
+        return price >= self.sell_at[number] * player.game.deeds[number].price
+
+    def reply_to_sell(self, player=None, seller=None, number=0, price=0):
+        """Buy at or below the buy_at price, if the player can pay."""
+        return price <= player.money and price <= self.buy_at[number] * player.game.deeds[number].price
+
+    def guess_income_tax(self, player=None):
+        """Pay the lower income tax."""
+        return min(0.1 * player.networth, 200.0)
+
+    def liquidate_or_auction(self, player=None):
+        """Liquidate (0) with the chance of liquidating on this space, or auction it (1)."""
+        if self.liquidate[player.position] >= 1.0:
+            return 0
+        if self.liquidate[player.position] <= 0.0:
+            return 1
+        r = player.game.random.uniform()
+        return 0 if r < self.liquidate[player.position] else 1
+
+# Shared default strategy
+DEFAULT_STRATEGY = Strategy()
@@ -0,0 +1,87 @@
+"""
+Stream.py - File for defining a RandomStream class.
+"""
+
+import random
+import numpy as np
+
+# Number of draws made at once for each kind of random value
+BLOCK_SIZE = 4096
+
+def new_seed():
+    """Draw a fresh root seed from the operating system."""
+    return random.SystemRandom().getrandbits(63)
+
+def spawn_seed(seed=0, number=0):
+    """Derive the independent seed of game number from a root seed, as 32 bit words."""
+    words = []
+    for key in (seed, number):
+        words.extend([key & 0xffffffff, (key >> 32) & 0xffffffff])
+    return words
+
+class RandomStream(object):
+    """Defines a Game's own random numbers, drawn in blocks and consumed one at a time."""
+
+    def __init__(self, seed=None, block=BLOCK_SIZE):
+        """Initialize a random stream."""
+        self.state = np.random.RandomState(seed)
+        self.block = block
+        self.dice = []
+        self.uniforms = []
+        self.normals = []
+        self.dice_index = 0
+        self.uniform_index = 0
+        self.normal_index = 0
+
+    def reseed(self, seed=None):
+        """Restart the stream from a new seed, dropping any buffered draws."""
+        self.state.seed(seed)
+        self.dice, self.uniforms, self.normals = [], [], []
+        self.dice_index, self.uniform_index, self.normal_index = 0, 0, 0
+        return self
+
+    def __repr__(self):
+        return 'RandomStream (block {})'.format(self.block)
+
+    def roll(self):
+        """Roll two fair six-sided dice. Return a (dice1, dice2) pair."""
+        if self.dice_index == len(self.dice):
+            self.dice = self.state.randint(1, 7, size=(self.block, 2)).tolist()
+            self.dice_index = 0
+        dice = self.dice[self.dice_index]
+        self.dice_index += 1
+        return dice
+
+    def uniform(self):
+        """Draw a uniform number in [0, 1)."""
+        if self.uniform_index == len(self.uniforms):
+            self.uniforms = self.state.random_sample(self.block).tolist()
+            self.uniform_index = 0
+        r = self.uniforms[self.uniform_index]
+        self.uniform_index += 1
+        return r
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        """Draw a normal number with mean loc and standard deviation scale, or an array of size numbers."""
+        if size is not None:
+            return loc + scale * np.array(self.standard_normals(size))
+        if self.normal_index == len(self.normals):
+            self.normals = self.state.standard_normal(self.block).tolist()
+            self.normal_index = 0
+        r = self.normals[self.normal_index]
+        self.normal_index += 1
+        return loc + scale * r
+
+    def standard_normals(self, size=0):
+        """Draw a list of size standard normal numbers, continuing the same stream as normal."""
+        if self.normal_index + size > len(self.normals):
+            self.normals = self.normals[self.normal_index:] + self.state.standard_normal(max(self.block, size)).tolist()
+            self.normal_index = 0
+        draws = self.normals[self.normal_index:self.normal_index + size]
+        self.normal_index += size
+        return draws
+
+    def shuffle(self, deck=None):
+        """Shuffle a deck in place."""
+        self.state.shuffle(deck)
+        return deck
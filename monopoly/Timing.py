@@ -0,0 +1,62 @@
+"""
+Timing.py - File for defining a PhaseTimer class.
+"""
+
+from timeit import default_timer as timer
+
+# Timed phases of a game, in turn order
+PHASES = ['dice', 'movement', 'handle_space', 'rent', 'develop', 'liquidate', 'auction', 'cards', 'recording']
+
+class PhaseTimer(object):
+    """
+    Defines call counts and inclusive wall time per phase of a game. Methods are timed by wrapping them on
+    the instance, so untimed games pay nothing. Nested calls of a phase, like movement from a card, are
+    counted but only the outermost call is timed.
+    """
+
+    def __init__(self, phases=None):
+        """Initialize a phase timer."""
+        self.phases = phases if phases else PHASES
+        self.calls = {}
+        self.time = {}
+        self.depth = {}
+        self.reset()
+
+    def __repr__(self):
+        return 'PhaseTimer ({:.3f} s)'.format(sum(self.time.itervalues()))
+
+    def reset(self):
+        """Zero all counters."""
+        self.calls = dict.fromkeys(self.phases, 0)
+        self.time = dict.fromkeys(self.phases, 0.0)
+        self.depth = dict.fromkeys(self.phases, 0)
+        return self
+
+    def wrap(self, phase='', func=None):
+        """Return func counting its calls and time under phase."""
+        def timed(*args, **kwargs):
+            """Call and time the wrapped function."""
+            self.calls[phase] += 1
+            if self.depth[phase]:
+                return func(*args, **kwargs)
+            self.depth[phase] += 1
+            start = timer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.time[phase] += timer() - start
+                self.depth[phase] -= 1
+        return timed
+
+    def instrument(self, obj=None, name='', phase=''):
+        """Time the method name of obj under phase."""
+        setattr(obj, name, self.wrap(phase, getattr(obj, name)))
+        return self
+
+    def summary(self):
+        """Return the counters as a dict of time_<phase> (seconds) and calls_<phase>."""
+        summary = {}
+        for phase in self.phases:
+            summary['time_{}'.format(phase)] = self.time[phase]
+            summary['calls_{}'.format(phase)] = self.calls[phase]
+        return summary
@@ -2,7 +2,13 @@
 monopoly.py - A Python implementation of Monopoly.
 """
 
-__all__ = ['Game', 'Property', 'Card', 'Bank', 'Player']
+from monopoly.Batch import run_games, run_until_converged, evaluate_strategies, sweep
+from monopoly.Strategy import Strategy, TableStrategy
+
+__all__ = [
+    'Game', 'Property', 'Card', 'Bank', 'Player', 'Batch', 'Engine', 'Markov', 'Timing', 'Results', 'Cache', 'Strategy',
+    'TableStrategy', 'run_games', 'run_until_converged', 'evaluate_strategies', 'sweep'
+]
 __version__ = '0.1.0'
 __date__ = '2017-01-28 06:24'
 __author__ = 'tmthydvnprt'
@@ -0,0 +1,76 @@
+"""
+test_batch.py - Tests of playing many games across processes.
+"""
+
+import os
+import logging
+
+import pytest
+
+from monopoly.Batch import run_games, run_until_converged, sweep
+from monopoly.Game import Game
+from monopoly.Strategy import Strategy
+
+SEED = 2017
+NUM_GAMES = 120
+
+def results(summaries):
+    """Return summaries without their wall times. Columns are sorted, their order follows the first bankruptcies."""
+    return summaries.drop(columns='elapsed_time').sort_index(axis=1)
+
+def test_workers_and_chunks():
+    """Games are the same in process, over a pool and in any chunks."""
+    single = results(run_games(NUM_GAMES, 3, workers=1, seed=SEED))
+    assert len(single) == NUM_GAMES
+    assert single.equals(results(run_games(NUM_GAMES, 3, workers=3, chunksize=7, seed=SEED)))
+    assert single.loc[60:].equals(results(run_games(NUM_GAMES - 60, 3, workers=2, seed=SEED, start=60)))
+
+def test_checkpoint_resume(tmpdir):
+    """A run resumed from a checkpoint cut short in the middle of a chunk equals an uninterrupted run."""
+    path = str(tmpdir.join('run.pkl'))
+    expected = results(run_games(NUM_GAMES, 2, workers=2, seed=SEED))
+    full = run_games(NUM_GAMES, 2, workers=2, chunksize=10, seed=SEED, checkpoint=path, checkpoint_interval=0.0)
+    assert results(full).equals(expected)
+    # Resuming a finished run plays nothing
+    assert results(run_games(NUM_GAMES, 2, workers=2, chunksize=10, seed=SEED, checkpoint=path)).equals(expected)
+    # Preempted while writing a chunk
+    with open(path, 'r+b') as f:
+        f.truncate(int(os.path.getsize(path) * 0.6))
+    resumed = run_games(NUM_GAMES, 2, workers=2, chunksize=10, checkpoint=path)
+    assert results(resumed).equals(expected)
+
+def test_checkpoint_of_another_run(tmpdir):
+    """A checkpoint is never resumed with other settings."""
+    path = str(tmpdir.join('run.pkl'))
+    run_games(20, 2, workers=1, seed=SEED, checkpoint=path)
+    with pytest.raises(ValueError):
+        run_games(20, 2, workers=1, seed=SEED, checkpoint=path, strategies=Strategy(risk_mean=0.5))
+    with pytest.raises(ValueError):
+        run_games(20, 2, workers=1, seed=SEED, checkpoint=path, init_cash=1000)
+
+def test_high_risk_sweep_cell(caplog):
+    """Players of a cell that often risk more than their cash never build past it, their counters stay right."""
+    cell = sweep({'num_players': [4], 'risk_mean': [1.0], 'risk_std': [0.5]}, games_per_cell=20, workers=1, seed=SEED)
+    assert cell['games'].tolist() == [20]
+    # The cell's games, in debug mode to check the counters and owners every turn, game 290 once built past its cash
+    strategy = Strategy(risk_mean=1.0, risk_std=0.5)
+    with caplog.at_level(logging.WARNING):
+        for number in xrange(280, 300):
+            game = Game(number, 4, seed=SEED, debug=True, strategies=strategy)
+            game.play_game()
+            assert all(plyr.check_counters() for plyr in game.seats)
+    assert not caplog.records
+
+def test_sweep_risk_above_one():
+    """A mean risk tolerance above 1 is rejected."""
+    with pytest.raises(ValueError):
+        sweep({'risk_mean': [1.5]}, games_per_cell=1, workers=1)
+
+def test_converged_batches():
+    """Converged runs are the games of run_games with the same seed, batches need games."""
+    summaries, estimates = run_until_converged(2, win_rate_tol=0.1, rounds_tol=5.0, networth_tol=500.0, batch=50, max_games=200, workers=1, seed=SEED)
+    assert estimates['converged'].all() or len(summaries) == 200
+    assert results(summaries).equals(results(run_games(len(summaries), 2, workers=1, seed=SEED)))
+    for batch, max_games in ((0, 100), (100, 0), (-1, 100)):
+        with pytest.raises(ValueError):
+            run_until_converged(2, batch=batch, max_games=max_games, workers=1, seed=SEED)
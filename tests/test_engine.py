@@ -0,0 +1,42 @@
+"""
+test_engine.py - Test that the lockstep Engine plays the same game as Game, in distribution.
+"""
+
+import numpy as np
+
+from monopoly.Batch import run_games
+from monopoly.Engine import Engine
+
+SEED = 2017
+NUM_GAMES = 1000
+NUM_PLAYERS = 4
+# Allowed difference of the means, in standard errors
+MAX_ERRORS = 4.0
+
+def agree(a, b):
+    """Check two samples have means within MAX_ERRORS standard errors of their difference."""
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    error = np.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b))
+    return abs(a.mean() - b.mean()) <= MAX_ERRORS * error
+
+def test_engine_agrees_with_game():
+    """Game lengths, finished games, networths and win rates per seat agree."""
+    games = run_games(NUM_GAMES, NUM_PLAYERS, seed=SEED)
+    engine = Engine(NUM_GAMES, NUM_PLAYERS, seed=SEED).play_games()
+    bankrupt = ['bankrupt_{}'.format(seat) for seat in xrange(NUM_PLAYERS)]
+    networth = ['networth_{}'.format(seat) for seat in xrange(NUM_PLAYERS)]
+    assert agree(games['rounds'], engine['rounds'])
+    assert agree((games[bankrupt] > 0).any(axis=1), (engine[bankrupt] > 0).any(axis=1))
+    assert agree(games[networth].values.ravel(), engine[networth].values.ravel())
+    for seat in xrange(NUM_PLAYERS):
+        assert agree(games['winner'] == seat, engine['winner'] == seat)
+
+def test_auction_winner_who_cannot_pay():
+    """A winner whose cash is all the price, as when every bid is capped by cash, does not buy."""
+    engine = Engine(3, 2, seed=SEED)
+    engine.money[:] = 100.0
+    games = np.arange(3)
+    engine.auction(games, np.full(3, 39))
+    assert (engine.owner[:, 39] == -1).all()
+    assert (engine.money == 100.0).all()
+    assert engine.active.all()
@@ -0,0 +1,71 @@
+"""
+test_game.py - Tests of playing a Game.
+"""
+
+import logging
+
+from monopoly.Game import Game
+
+SEED = 2017
+NUM_GAMES = 30
+
+def summary(game):
+    """Return a game's summary without its wall time."""
+    summary = game.summary()
+    del summary['elapsed_time']
+    return summary
+
+def test_seeded_replay():
+    """The same seed and game number replay the same game."""
+    for number in xrange(NUM_GAMES):
+        first = Game(number, 3, seed=SEED, recordData=True, debug=False)
+        second = Game(number, 3, seed=SEED, recordData=True, debug=False)
+        assert first.play_game().equals(second.play_game())
+        assert summary(first) == summary(second)
+
+def test_reset_is_a_fresh_game():
+    """A reused game plays as a new Game of the same seed and number."""
+    game = Game(0, 4, seed=SEED, recordData=True, debug=False)
+    for number in xrange(NUM_GAMES):
+        game.reset(SEED, number)
+        fresh = Game(number, 4, seed=SEED, recordData=True, debug=False)
+        assert game.play_game().equals(fresh.play_game())
+        assert summary(game) == summary(fresh)
+
+def test_money_supply(caplog):
+    """Money is only created by the ledger's mints, every round and at the end of every game."""
+    game = Game(0, 4, seed=SEED, debug=True)
+    with caplog.at_level(logging.WARNING):
+        for number in xrange(NUM_GAMES):
+            game.reset(SEED, number)
+            game.play_game()
+            assert abs(game.money_supply - game.total_money - game.ledger.minted) < 1e-6
+    assert not caplog.records
+
+def test_owners_after_bankruptcy(caplog):
+    """The ownership index matches the deeds every turn and bankrupt players own nothing."""
+    game = Game(0, 4, seed=SEED, debug=True)
+    bankruptcies = 0
+    with caplog.at_level(logging.WARNING):
+        for number in xrange(NUM_GAMES):
+            game.reset(SEED, number)
+            game.play_game()
+            assert game.check_owners()
+            for plyr in game.bankrupted:
+                assert not plyr.properties
+                assert plyr not in game.owners
+            bankruptcies += len(game.bankrupted)
+    assert bankruptcies
+    assert not caplog.records
+
+def test_buyer_who_cannot_pay():
+    """A buyer without the money never gets the deed."""
+    game = Game(0, 2, seed=SEED, debug=False)
+    plyr = game.seats[0]
+    plyr.money = 10.0
+    plyr.buy_property(1, 100.0)
+    assert game.owners[1] is None
+    assert game.deeds[1] in game.properties
+    assert not plyr.properties
+    assert plyr.money == 10.0
+    assert game.check_owners()
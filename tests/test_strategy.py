@@ -0,0 +1,22 @@
+"""
+test_strategy.py - Tests of games played with player strategies.
+"""
+
+import logging
+
+from monopoly.Game import Game
+from monopoly.Strategy import Strategy, TableStrategy
+
+SEED = 2017
+NUM_GAMES = 30
+
+def test_high_risk_strategies(caplog):
+    """Strategies risking more than the player's cash never build past it, the counters and owners stay right."""
+    with caplog.at_level(logging.WARNING):
+        for strategies in ([TableStrategy(risk=2.0)] * 2, [Strategy(risk_mean=1.5), TableStrategy(risk=2.0)]):
+            for number in xrange(NUM_GAMES):
+                game = Game(number, 2, seed=SEED, debug=True, strategies=strategies)
+                game.play_game()
+                assert all(plyr.check_counters() for plyr in game.seats)
+                assert game.check_owners()
+    assert not caplog.records